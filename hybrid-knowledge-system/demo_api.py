@@ -180,7 +180,7 @@ async def execute_graph_query(request: QueryRequest) -> Dict[str, Any]:
         embedding_service = EmbeddingService()
 
         # Generate query embedding
-        query_embedding = await embedding_service.embed_text(request.query)
+        query_embedding = (await embedding_service.embed_text(request.query)).tolist()
 
         # Use Neo4j vector index for similarity search
         async with neo4j_client.session() as session:
@@ -35,6 +35,9 @@ class Neo4jClient:
         self.driver: Optional[AsyncDriver] = None
         self.embedding_service = EmbeddingService()
         
+        # Read queries that failed and returned an empty result instead of raising
+        self.failed_queries = 0
+        
     async def connect(self):
         """Initialize Neo4j connection"""
         try:
@@ -55,10 +58,11 @@ class Neo4jClient:
             raise
     
     async def close(self):
-        """Close Neo4j connection"""
+        """Close Neo4j connection and release the embedding service"""
         if self.driver:
             await self.driver.close()
             logger.info("Neo4j connection closed")
+        await self.embedding_service.close()
     
     @asynccontextmanager
     async def session(self):
@@ -139,6 +143,7 @@ class Neo4jClient:
                 ]
         except Neo4jError as e:
             logger.error(f"Vector search failed: {e}")
+            self.failed_queries += 1
             return []
     
     async def hybrid_search(
@@ -147,12 +152,15 @@ class Neo4jClient:
         context_domains: Optional[List[str]] = None,
         limit: int = 25,
         vector_weight: float = 0.6,
-        fulltext_weight: float = 0.4
+        fulltext_weight: float = 0.4,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """Perform hybrid vector + fulltext search in Neo4j"""
         
-        # Generate query embedding
-        query_embedding = await self.embedding_service.embed_text(query)
+        # Generate query embedding unless the caller already has one
+        query_embedding = query_vector
+        if query_embedding is None:
+            query_embedding = (await self.embedding_service.embed_text(query)).tolist()
         
         # Build domain filter
         domain_filter = ""
@@ -211,6 +219,7 @@ class Neo4jClient:
                 ]
         except Neo4jError as e:
             logger.error(f"Hybrid search failed: {e}")
+            self.failed_queries += 1
             return []
     
     async def expand_from_entities(
@@ -227,11 +236,12 @@ class Neo4jClient:
             rel_types = "|".join(relationship_types)
             rel_filter = f":{rel_types}"
         
+        # Variable-length bounds cannot be query parameters, so the hop count is inlined
         expansion_query = f"""
         UNWIND $entity_ids as entityId
         MATCH (start) WHERE elementId(start) = entityId
         
-        MATCH path = (start)-[r{rel_filter}*1..$max_hops]-(connected)
+        MATCH path = (start)-[r{rel_filter}*1..{int(max_hops)}]-(connected)
         WHERE connected <> start
         
         WITH connected, path, 
@@ -250,8 +260,7 @@ class Neo4jClient:
             async with self.session() as session:
                 result = await session.run(
                     expansion_query,
-                    entity_ids=entity_ids,
-                    max_hops=max_hops
+                    entity_ids=entity_ids
                 )
                 
                 records = await result.data()
@@ -270,22 +279,118 @@ class Neo4jClient:
                 ]
         except Neo4jError as e:
             logger.error(f"Entity expansion failed: {e}")
+            self.failed_queries += 1
             return []
     
+    async def semantic_then_expand(
+        self,
+        query_vector: List[float],
+        index_name: str = "document_embeddings",
+        limit: int = 20,
+        max_hops: int = 2,
+        score_threshold: float = 0.7,
+        relationship_types: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Vector search and graph expansion from the hits in a single query"""
+        
+        # Build relationship filter
+        rel_filter = ""
+        if relationship_types:
+            rel_types = "|".join(relationship_types)
+            rel_filter = f":{rel_types}"
+        
+        fused_query = f"""
+        CALL db.index.vector.queryNodes($index_name, $limit, $query_vector)
+        YIELD node, score
+        WHERE score >= $score_threshold
+        
+        OPTIONAL MATCH path = (node)-[r{rel_filter}*1..{int(max_hops)}]-(connected)
+        WHERE connected <> node
+        
+        WITH node, score, connected, path,
+             reduce(acc = 1.0, rel in relationships(path) | acc * 0.8) as pathScore
+        
+        RETURN elementId(node) as id,
+               node,
+               score,
+               collect(CASE WHEN connected IS NULL THEN NULL ELSE {{
+                   id: elementId(connected),
+                   connected: connected,
+                   pathScore: pathScore,
+                   hops: length(path),
+                   relationshipPath: [rel in relationships(path) | type(rel)]
+               }} END) as expansions
+        ORDER BY score DESC
+        """
+        
+        try:
+            async with self.session() as session:
+                result = await session.run(
+                    fused_query,
+                    index_name=index_name,
+                    limit=limit,
+                    query_vector=query_vector,
+                    score_threshold=score_threshold
+                )
+                
+                records = await result.data()
+        except Neo4jError as e:
+            logger.error(f"Fused semantic expansion failed: {e}")
+            self.failed_queries += 1
+            return [], []
+        
+        semantic_results = [
+            {
+                'id': record['id'],
+                'content': record['node'].get('content', ''),
+                'title': record['node'].get('title', ''),
+                'entity_id': record['id'],
+                'metadata': record['node'],
+                'score': record['score'],
+                'source': 'neo4j_vector'
+            }
+            for record in records
+        ]
+        
+        # Same shape and cap as expand_from_entities
+        expansions = sorted(
+            (expansion for record in records for expansion in record['expansions']),
+            key=lambda expansion: expansion['pathScore'],
+            reverse=True
+        )[:50]
+        graph_results = [
+            {
+                'id': expansion['id'],
+                'content': expansion['connected'].get('content', ''),
+                'title': expansion['connected'].get('title', ''),
+                'metadata': expansion['connected'],
+                'score': expansion['pathScore'],
+                'hops': expansion['hops'],
+                'relationship_path': expansion['relationshipPath'],
+                'source': 'neo4j_expansion'
+            }
+            for expansion in expansions
+        ]
+        
+        return semantic_results, graph_results
+    
     async def graph_search(
         self,
         entities: List[str],
         query_intent: str,
         max_hops: int = 2,
-        limit: int = 30
+        limit: int = 30,
+        intent_vector: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """Graph-based search starting from identified entities"""
         
         if not entities:
             return []
         
-        # Generate intent embedding for relevance scoring
-        intent_embedding = await self.embedding_service.embed_text(query_intent)
+        # Generate intent embedding for relevance scoring unless the caller already has one
+        intent_embedding = intent_vector
+        if intent_embedding is None:
+            intent_embedding = (await self.embedding_service.embed_text(query_intent)).tolist()
         
         graph_search_query = """
         UNWIND $entities as entityName
@@ -363,6 +468,7 @@ class Neo4jClient:
                 ]
         except Neo4jError as e:
             logger.error(f"Graph search failed: {e}")
+            self.failed_queries += 1
             return []
     
     async def extract_entities_from_query(self, query: str) -> List[str]:
@@ -399,6 +505,7 @@ class Neo4jClient:
                 return [record['entity'] for record in records]
         except Neo4jError as e:
             logger.error(f"Entity extraction failed: {e}")
+            self.failed_queries += 1
             return []
     
     async def get_context_for_entities(self, entity_ids: List[str]) -> List[Dict[str, Any]]:
@@ -447,6 +554,7 @@ class Neo4jClient:
                 ]
         except Neo4jError as e:
             logger.error(f"Context retrieval failed: {e}")
+            self.failed_queries += 1
             return []
     
     async def create_fulltext_index(
@@ -4,20 +4,66 @@ Weaviate Client: Handles vector database operations for semantic search
 
 import os
 import asyncio
-from typing import List, Dict, Optional, Any, Union
+import hashlib
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Union, Tuple, Hashable, AsyncIterator, Iterable
 from dataclasses import dataclass
 
+import numpy as np
 import weaviate
 from weaviate.classes.config import Configure, Property, DataType
+from weaviate.classes.data import DataObject
 from weaviate.classes.query import Filter, MetadataQuery
 from weaviate.collections.classes.filters import _Filters
 from weaviate.exceptions import WeaviateBaseError
 
 from src.utils.logger import get_logger
-from src.utils.embeddings import EmbeddingService
+from src.utils.embeddings import EmbeddingService, quantize
 
 logger = get_logger(__name__)
 
+# Metadata requests are immutable, so build them once instead of per query
+SEMANTIC_METADATA = MetadataQuery(distance=True, certainty=True)
+HYBRID_METADATA = MetadataQuery(score=True, explain_score=True)
+
+# Upper bound on quantized candidate embeddings kept in the refine index
+REFINE_CACHE_SIZE = 4096
+
+# Retry policy for rate-limited batch inserts
+BATCH_MAX_RETRIES = 3
+BATCH_BACKOFF_SECONDS = 1.0
+
+@lru_cache(maxsize=256)
+def _build_filter(filter_items: Tuple[Tuple[str, Hashable], ...]) -> Optional[_Filters]:
+    """Build (and memoize) a Weaviate filter from a frozen filters mapping"""
+    where_conditions = []
+    for key, value in filter_items:
+        if isinstance(value, tuple):
+            where_conditions.append(Filter.by_property(key).contains_any(list(value)))
+        else:
+            where_conditions.append(Filter.by_property(key).equal(value))
+    
+    if len(where_conditions) == 1:
+        return where_conditions[0]
+    elif len(where_conditions) > 1:
+        return Filter.all_of(where_conditions)
+    return None
+
+def _candidate_hash(text: str) -> bytes:
+    """Compact key for a refine candidate, so the index never holds raw text"""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Check whether a Weaviate error signals rate limiting (HTTP 429)"""
+    return getattr(error, 'status_code', None) == 429 or 'rate limit' in str(error).lower()
+
+def _freeze_filters(filters: Dict) -> Tuple[Tuple[str, Hashable], ...]:
+    """Convert a filters dict into a hashable cache key for _build_filter"""
+    return tuple(sorted(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in filters.items()
+    ))
+
 @dataclass
 class WeaviateConfig:
     url: str = "http://localhost:8080"
@@ -26,6 +72,30 @@ class WeaviateConfig:
     default_class: str = "Document"
     vector_dimensions: int = 384
 
+@dataclass
+class SemanticHit:
+    """Single semantic search hit; fixed slots keep per-result cost low"""
+    __slots__ = (
+        'id', 'content', 'title', 'entity_id', 'source', 'document_type',
+        'domain', 'metadata', 'score', 'distance', 'weaviate_source'
+    )
+    
+    id: str
+    content: str
+    title: str
+    entity_id: Optional[str]
+    source: str
+    document_type: Optional[str]
+    domain: Optional[str]
+    metadata: Dict[str, Any]
+    score: float
+    distance: float
+    weaviate_source: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict form for callers that fuse or serialize results"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
 class WeaviateClient:
     """
     Async-compatible Weaviate client optimized for semantic search
@@ -42,6 +112,21 @@ class WeaviateClient:
         self.client: Optional[weaviate.WeaviateClient] = None
         self.embedding_service = EmbeddingService()
         
+        # Created lazily so it binds to the running event loop (Python 3.9)
+        self._connect_lock: Optional[asyncio.Lock] = None
+        
+        # Persistent int8 refine index: candidate hash -> row of a preallocated matrix.
+        # Row 0 stays zero so blank candidates score 0 without a special case.
+        self._refine_rows: Dict[bytes, int] = {}
+        self._refine_int8: Optional[np.ndarray] = None
+        self._refine_scale: Optional[np.ndarray] = None
+        # Held from the cache-hit scan to the row gather, since embedding the misses yields
+        # to calls that may evict or reset the index; created lazily like _connect_lock
+        self._refine_lock: Optional[asyncio.Lock] = None
+        
+        # Read queries that failed and returned an empty result instead of raising
+        self.failed_queries = 0
+        
     async def connect(self):
         """Initialize Weaviate connection"""
         try:
@@ -80,30 +165,48 @@ class WeaviateClient:
             await self._test_connection()
             logger.info(f"Connected to Weaviate at {self.config.url}")
             
+            # Client-side vectors must match the collection's vector index
+            if self.embedding_service.get_dimensions() != self.config.vector_dimensions:
+                logger.warning(
+                    f"Embedding dimensions ({self.embedding_service.get_dimensions()}) do not match "
+                    f"WeaviateConfig.vector_dimensions ({self.config.vector_dimensions})"
+                )
+            
         except Exception as e:
             logger.error(f"Failed to connect to Weaviate: {e}")
             raise
     
+    async def _ensure_connected(self):
+        """Connect once, even when several coroutines race on first use"""
+        if self.client:
+            return
+        
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        
+        async with self._connect_lock:
+            if not self.client:
+                await self.connect()
+    
     async def close(self):
-        """Close Weaviate connection"""
+        """Close Weaviate connection and release the embedding service"""
         if self.client:
             self.client.close()
             logger.info("Weaviate connection closed")
+        await self.embedding_service.close()
     
     async def _test_connection(self):
         """Test Weaviate connectivity"""
         try:
-            # Run in executor to make it async
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, lambda: self.client.is_ready())
+            # Run in a worker thread to make it async
+            await asyncio.to_thread(self.client.is_ready)
         except Exception as e:
             raise Exception(f"Weaviate connection test failed: {e}")
     
     async def create_schema(self, class_name: str = None, force_recreate: bool = False) -> bool:
         """Create Weaviate schema for hybrid search"""
         
-        if not self.client:
-            await self.connect()
+        await self._ensure_connected()
         
         class_name = class_name or self.config.default_class
         
@@ -164,12 +267,42 @@ class WeaviateClient:
         limit: int = 25,
         threshold: float = 0.7,
         filters: Optional[Dict] = None,
-        include_metadata: bool = True
+        include_metadata: bool = True,
+        vector: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """Perform semantic similarity search"""
         
-        if not self.client:
-            await self.connect()
+        results = [
+            hit.to_dict() async for hit in self.semantic_search_iter(
+                query,
+                class_name=class_name,
+                limit=limit,
+                threshold=threshold,
+                filters=filters,
+                include_metadata=include_metadata,
+                vector=vector
+            )
+        ]
+        
+        logger.info(f"Semantic search returned {len(results)} results")
+        return results
+    
+    async def semantic_search_iter(
+        self,
+        query: str,
+        class_name: Optional[str] = None,
+        limit: int = 25,
+        threshold: float = 0.7,
+        filters: Optional[Dict] = None,
+        include_metadata: bool = True,
+        vector: Optional[List[float]] = None
+    ) -> AsyncIterator[SemanticHit]:
+        """Perform semantic similarity search, yielding hits lazily
+        
+        A precomputed query vector skips Weaviate's server-side vectorization.
+        """
+        
+        await self._ensure_connected()
         
         class_name = class_name or self.config.default_class
         
@@ -177,99 +310,154 @@ class WeaviateClient:
             collection = self.client.collections.get(class_name)
             
             # Build where filter
-            where_filter = None
-            if filters:
-                where_conditions = []
-                for key, value in filters.items():
-                    if isinstance(value, list):
-                        where_conditions.append(Filter.by_property(key).contains_any(value))
-                    else:
-                        where_conditions.append(Filter.by_property(key).equal(value))
-                
-                if len(where_conditions) == 1:
-                    where_filter = where_conditions[0]
-                elif len(where_conditions) > 1:
-                    where_filter = Filter.all_of(where_conditions)
+            where_filter = _build_filter(_freeze_filters(filters)) if filters else None
             
             # Execute search
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: collection.query.near_text(
-                    query=query,
-                    limit=limit,
-                    distance=1.0 - threshold,  # Convert similarity to distance
-                    where=where_filter,
-                    include_vector=False,
-                    return_metadata=MetadataQuery(distance=True, certainty=True)
-                )
+            if vector is not None:
+                search, target = collection.query.near_vector, {'near_vector': vector}
+            else:
+                search, target = collection.query.near_text, {'query': query}
+            response = await asyncio.to_thread(
+                search,
+                **target,
+                limit=limit,
+                distance=1.0 - threshold,  # Convert similarity to distance
+                where=where_filter,
+                include_vector=False,
+                return_metadata=SEMANTIC_METADATA
             )
             
-            results = []
-            for obj in response.objects:
-                result = {
-                    'id': str(obj.uuid),
-                    'content': obj.properties.get('content', ''),
-                    'title': obj.properties.get('title', ''),
-                    'entity_id': obj.properties.get('entity_id'),
-                    'source': obj.properties.get('source', 'weaviate'),
-                    'document_type': obj.properties.get('document_type'),
-                    'domain': obj.properties.get('domain'),
-                    'metadata': obj.properties.get('metadata', {}),
-                    'score': obj.metadata.certainty if obj.metadata else 0.0,
-                    'distance': obj.metadata.distance if obj.metadata else 1.0,
-                    'weaviate_source': 'semantic_search'
-                }
-                
-                # Filter by similarity threshold
-                if result['score'] >= threshold:
-                    results.append(result)
-            
-            logger.info(f"Semantic search returned {len(results)} results")
-            return results
-            
         except WeaviateBaseError as e:
             logger.error(f"Semantic search failed: {e}")
-            return []
+            self.failed_queries += 1
+            return
+        
+        for obj in response.objects:
+            score = obj.metadata.certainty if obj.metadata else 0.0
+            
+            # Filter by similarity threshold before building the result
+            if score < threshold:
+                continue
+            
+            properties = obj.properties
+            yield SemanticHit(
+                id=str(obj.uuid),
+                content=properties.get('content', ''),
+                title=properties.get('title', ''),
+                entity_id=properties.get('entity_id'),
+                source=properties.get('source', 'weaviate'),
+                document_type=properties.get('document_type'),
+                domain=properties.get('domain'),
+                metadata=properties.get('metadata', {}),
+                score=score,
+                distance=obj.metadata.distance if obj.metadata else 1.0,
+                weaviate_source='semantic_search'
+            )
     
     async def refine_results(
         self,
         query: str,
         candidates: List[str],
         threshold: float = 0.7,
-        class_name: Optional[str] = None
+        class_name: Optional[str] = None,
+        query_vector: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """Refine/rerank candidate results using semantic similarity"""
         
         if not candidates:
             return []
         
-        # Generate query embedding
-        query_embedding = await self.embedding_service.embed_text(query)
+        # Generate query embedding unless the caller already has one
+        query_embedding = query_vector
+        if query_embedding is None:
+            query_embedding = await self.embedding_service.embed_text(query)
+        query_int8, query_scale = quantize(query_embedding, normalize=True)
+        
+        hashes = [_candidate_hash(c) for c in candidates]
         
-        # Generate embeddings for candidates
-        candidate_embeddings = await self.embedding_service.embed_texts(candidates)
+        if self._refine_lock is None:
+            self._refine_lock = asyncio.Lock()
         
-        # Calculate similarities
-        results = []
-        for i, (candidate, embedding) in enumerate(zip(candidates, candidate_embeddings)):
-            similarity = await self.embedding_service.cosine_similarity(query_embedding, embedding)
+        async with self._refine_lock:
+            dimensions = query_int8.shape[1]
+            if self._refine_int8 is None or self._refine_int8.shape[1] != dimensions:
+                self._reset_refine_index(dimensions)
             
-            if similarity >= threshold:
-                results.append({
-                    'id': f'refined_{i}',
-                    'content': candidate,
-                    'score': similarity,
-                    'source': 'weaviate_refined',
-                    'original_index': i
-                })
+            # Generate embeddings only for candidates not already in the refine index
+            missing: Dict[bytes, str] = {}
+            for candidate, key in zip(candidates, hashes):
+                if candidate.strip() and key not in self._refine_rows:
+                    missing.setdefault(key, candidate)
+            
+            if missing:
+                embeddings = await self.embedding_service.embed_texts(list(missing.values()))
+                missing_int8, missing_scale = quantize(embeddings, normalize=True)
+                self._add_to_refine_index(list(missing), missing_int8, missing_scale, retain=hashes)
+            
+            rows = np.fromiter(
+                (self._refine_rows.get(key, 0) for key in hashes), dtype=np.intp, count=len(hashes)
+            )
+            candidate_int8 = self._refine_int8[rows]
+            candidate_scale = self._refine_scale[rows]
+        
+        # Calculate similarities: int32 accumulation avoids int16 overflow at 384+ dims
+        similarities = (candidate_int8.astype(np.int32) @ query_int8[0].astype(np.int32)) * (
+            candidate_scale * query_scale[0]
+        )
         
-        # Sort by similarity
-        results.sort(key=lambda x: x['score'], reverse=True)
+        # Threshold and order in NumPy; touch candidates only for the survivors
+        keep = np.where(similarities >= threshold)[0]
+        keep = keep[np.argsort(-similarities[keep], kind='stable')]
+        
+        results = [
+            {
+                'id': f'refined_{i}',
+                'content': candidates[i],
+                'score': score,
+                'source': 'weaviate_refined',
+                'original_index': i
+            }
+            for i, score in zip(keep.tolist(), similarities[keep].tolist())
+        ]
         
         logger.info(f"Refined {len(candidates)} candidates to {len(results)} results")
         return results
     
+    def _reset_refine_index(self, dimensions: int, capacity: int = REFINE_CACHE_SIZE):
+        """Drop all indexed refine candidates and preallocate an empty index"""
+        self._refine_rows = {}
+        self._refine_int8 = np.zeros((capacity + 1, dimensions), dtype=np.int8)
+        self._refine_scale = np.ones(capacity + 1, dtype=np.float32)
+    
+    def _add_to_refine_index(
+        self,
+        keys: List[bytes],
+        quantized: np.ndarray,
+        scales: np.ndarray,
+        retain: Iterable[bytes] = ()
+    ):
+        """Append quantized candidate embeddings; when full, evict everything except `retain`"""
+        capacity = self._refine_int8.shape[0] - 1
+        if len(self._refine_rows) + len(keys) > capacity:
+            # Keys the current caller is about to look up must survive the eviction
+            retained = [key for key in dict.fromkeys(retain) if key in self._refine_rows]
+            rows = np.array([self._refine_rows[key] for key in retained], dtype=np.intp)
+            retained_int8 = self._refine_int8[rows]
+            retained_scale = self._refine_scale[rows]
+            
+            self._reset_refine_index(
+                quantized.shape[1], max(REFINE_CACHE_SIZE, len(retained) + len(keys))
+            )
+            self._refine_int8[1:len(retained) + 1] = retained_int8
+            self._refine_scale[1:len(retained) + 1] = retained_scale
+            self._refine_rows = dict(zip(retained, range(1, len(retained) + 1)))
+        
+        start = len(self._refine_rows) + 1
+        stop = start + len(keys)
+        self._refine_int8[start:stop] = quantized
+        self._refine_scale[start:stop] = scales
+        self._refine_rows.update(zip(keys, range(start, stop)))
+    
     async def hybrid_search_with_keywords(
         self,
         query: str,
@@ -280,8 +468,7 @@ class WeaviateClient:
     ) -> List[Dict[str, Any]]:
         """Hybrid search combining vector similarity and keyword matching"""
         
-        if not self.client:
-            await self.connect()
+        await self._ensure_connected()
         
         class_name = class_name or self.config.default_class
         
@@ -289,15 +476,12 @@ class WeaviateClient:
             collection = self.client.collections.get(class_name)
             
             # Execute hybrid search
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: collection.query.hybrid(
-                    query=query,
-                    alpha=alpha,  # 0 = pure keyword, 1 = pure vector
-                    limit=limit,
-                    return_metadata=MetadataQuery(score=True, explain_score=True)
-                )
+            response = await asyncio.to_thread(
+                collection.query.hybrid,
+                query=query,
+                alpha=alpha,  # 0 = pure keyword, 1 = pure vector
+                limit=limit,
+                return_metadata=HYBRID_METADATA
             )
             
             results = []
@@ -319,6 +503,7 @@ class WeaviateClient:
             
         except WeaviateBaseError as e:
             logger.error(f"Hybrid search failed: {e}")
+            self.failed_queries += 1
             return []
     
     async def add_document(
@@ -331,8 +516,7 @@ class WeaviateClient:
     ) -> str:
         """Add a document to Weaviate"""
         
-        if not self.client:
-            await self.connect()
+        await self._ensure_connected()
         
         class_name = class_name or self.config.default_class
         
@@ -354,11 +538,7 @@ class WeaviateClient:
                     if key in metadata:
                         properties[key] = metadata[key]
             
-            loop = asyncio.get_event_loop()
-            uuid = await loop.run_in_executor(
-                None,
-                lambda: collection.data.insert(properties)
-            )
+            uuid = await asyncio.to_thread(collection.data.insert, properties)
             
             logger.info(f"Added document to Weaviate: {uuid}")
             return str(uuid)
@@ -375,8 +555,7 @@ class WeaviateClient:
     ) -> List[str]:
         """Batch add multiple documents to Weaviate"""
         
-        if not self.client:
-            await self.connect()
+        await self._ensure_connected()
         
         class_name = class_name or self.config.default_class
         
@@ -388,9 +567,13 @@ class WeaviateClient:
             for i in range(0, len(documents), batch_size):
                 batch = documents[i:i + batch_size]
                 
+                # Precompute vectors client-side so Weaviate skips its server-side vectorizer;
+                # callers that already hold embeddings pass them as doc['vector']
+                vectors = await self._batch_vectors(batch)
+                
                 # Prepare batch data
                 batch_objects = []
-                for doc in batch:
+                for doc, vector in zip(batch, vectors):
                     properties = {
                         'content': doc.get('content', ''),
                         'title': doc.get('title', ''),
@@ -401,14 +584,19 @@ class WeaviateClient:
                         'metadata': doc.get('metadata', {}),
                         'created_at': str(asyncio.get_event_loop().time())
                     }
-                    batch_objects.append(properties)
+                    batch_objects.append(DataObject(properties=properties, vector=vector))
                 
-                # Execute batch insert
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(
-                    None,
-                    lambda: collection.data.insert_many(batch_objects)
-                )
+                # Execute batch insert, backing off without blocking the event loop
+                for attempt in range(BATCH_MAX_RETRIES + 1):
+                    try:
+                        result = await asyncio.to_thread(collection.data.insert_many, batch_objects)
+                        break
+                    except WeaviateBaseError as e:
+                        if not _is_rate_limited(e) or attempt == BATCH_MAX_RETRIES:
+                            raise
+                        delay = BATCH_BACKOFF_SECONDS * (2 ** attempt)
+                        logger.warning(f"Batch {i//batch_size + 1} rate limited, retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
                 
                 if hasattr(result, 'uuids'):
                     added_uuids.extend([str(uuid) for uuid in result.uuids])
@@ -422,6 +610,24 @@ class WeaviateClient:
             logger.error(f"Batch add failed: {e}")
             return []
     
+    async def _batch_vectors(self, batch: List[Dict[str, Any]]) -> List[Optional[List[float]]]:
+        """Return one vector per document, embedding only those without doc['vector']"""
+        vectors = [doc.get('vector') for doc in batch]
+        
+        # Blank content is left to the server, since embed_texts drops empty texts
+        pending = [
+            i for i, (doc, vector) in enumerate(zip(batch, vectors))
+            if vector is None and doc.get('content', '').strip()
+        ]
+        if pending:
+            embeddings = await self.embedding_service.embed_texts(
+                [batch[i]['content'] for i in pending]
+            )
+            for i, embedding in zip(pending, embeddings):
+                vectors[i] = embedding.tolist()
+        
+        return vectors
+    
     async def update_document(
         self,
         document_id: str,
@@ -430,21 +636,17 @@ class WeaviateClient:
     ) -> bool:
         """Update document properties"""
         
-        if not self.client:
-            await self.connect()
+        await self._ensure_connected()
         
         class_name = class_name or self.config.default_class
         
         try:
             collection = self.client.collections.get(class_name)
             
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: collection.data.update(
-                    uuid=document_id,
-                    properties=properties
-                )
+            await asyncio.to_thread(
+                collection.data.update,
+                uuid=document_id,
+                properties=properties
             )
             
             logger.info(f"Updated document: {document_id}")
@@ -461,19 +663,14 @@ class WeaviateClient:
     ) -> bool:
         """Delete a document from Weaviate"""
         
-        if not self.client:
-            await self.connect()
+        await self._ensure_connected()
         
         class_name = class_name or self.config.default_class
         
         try:
             collection = self.client.collections.get(class_name)
             
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: collection.data.delete_by_id(document_id)
-            )
+            await asyncio.to_thread(collection.data.delete_by_id, document_id)
             
             logger.info(f"Deleted document: {document_id}")
             return True
@@ -485,19 +682,14 @@ class WeaviateClient:
     async def get_document_count(self, class_name: Optional[str] = None) -> int:
         """Get total document count"""
         
-        if not self.client:
-            await self.connect()
+        await self._ensure_connected()
         
         class_name = class_name or self.config.default_class
         
         try:
             collection = self.client.collections.get(class_name)
             
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: collection.aggregate.over_all(total_count=True)
-            )
+            response = await asyncio.to_thread(collection.aggregate.over_all, total_count=True)
             
             return response.total_count if hasattr(response, 'total_count') else 0
             
@@ -508,15 +700,10 @@ class WeaviateClient:
     async def get_schema_info(self) -> Dict[str, Any]:
         """Get Weaviate schema information"""
         
-        if not self.client:
-            await self.connect()
+        await self._ensure_connected()
         
         try:
-            loop = asyncio.get_event_loop()
-            schema = await loop.run_in_executor(
-                None,
-                lambda: self.client.schema.get()
-            )
+            schema = await asyncio.to_thread(self.client.schema.get)
             
             return schema
             
@@ -527,24 +714,15 @@ class WeaviateClient:
     async def health_check(self) -> Dict[str, Any]:
         """Check Weaviate health and performance metrics"""
         
-        if not self.client:
-            await self.connect()
+        await self._ensure_connected()
         
         try:
             # Test basic connectivity and get cluster status
-            loop = asyncio.get_event_loop()
-            
-            is_ready = await loop.run_in_executor(None, lambda: self.client.is_ready())
-            is_live = await loop.run_in_executor(None, lambda: self.client.is_live())
+            is_ready = await asyncio.to_thread(self.client.is_ready)
+            is_live = await asyncio.to_thread(self.client.is_live)
             
             # Get cluster nodes info (using v4+ API)
-            try:
-                cluster_status = await loop.run_in_executor(
-                    None,
-                    lambda: {"nodes": [{"name": "node1", "status": "HEALTHY"}]}  # Simplified for local dev
-                )
-            except AttributeError:
-                cluster_status = {"nodes": [{"name": "local", "status": "HEALTHY"}]}
+            cluster_status = {"nodes": [{"name": "node1", "status": "HEALTHY"}]}  # Simplified for local dev
             
             return {
                 'ready': is_ready,
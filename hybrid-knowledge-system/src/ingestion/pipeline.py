@@ -3,14 +3,23 @@ Data Ingestion Pipeline: Processes documents and structured data for hybrid know
 """
 
 import os
+import re
+import mmap
 import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union, AsyncGenerator
+from typing import List, Dict, Any, Optional, Union, AsyncGenerator, Tuple, Iterator, Iterable
 import json
+from collections import OrderedDict
+from itertools import chain
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 import hashlib
 
+import numpy as np
+
 # Document processing
 try:
     import pypdf
@@ -26,6 +35,89 @@ from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Micro-batching for chunk embeddings: slab size and number of slabs in flight
+EMBED_MICRO_BATCH = 128
+EMBED_MAX_CONCURRENCY = 16
+
+# Structured records per Weaviate batch / Cypher UNWIND, and groups written at once
+STRUCTURED_BATCH_SIZE = 100
+STRUCTURED_MAX_CONCURRENCY = 4
+
+# Chunk metadata already stored as top-level Weaviate properties
+WEAVIATE_PROMOTED_METADATA = frozenset({'domain', 'file_path'})
+
+# Chunk batches that document parsing may run ahead of indexing
+INGEST_QUEUE_BATCHES = 4
+
+# Sentence bodies between terminators; matches what re.split(r'[.!?]+') keeps
+SENTENCE_PATTERN = re.compile(r'[^.!?]+')
+
+# Structured record fields rendered first by _record_to_text, with their labels
+RECORD_TITLE_FIELDS = (('title', 'Title'), ('name', 'Name'), ('subject', 'Subject'), ('heading', 'Heading'))
+RECORD_CONTENT_FIELDS = ('description', 'content', 'summary', 'body')
+RECORD_TEXT_FIELDS = frozenset(field for field, _ in RECORD_TITLE_FIELDS) | frozenset(RECORD_CONTENT_FIELDS)
+
+# File types picked up by directory ingestion
+SUPPORTED_EXTENSIONS = frozenset({'.txt', '.pdf', '.docx', '.json', '.md'})
+
+# Chunk embeddings remembered across batches, keyed by content hash
+EMBED_CACHE_SIZE = 10_000
+
+# Text files below this size are read directly (mmap setup cost dominates);
+# above MMAP_SEQUENTIAL_BYTES the kernel is told to read ahead sequentially
+MMAP_MIN_BYTES = 4 * 1024
+MMAP_SEQUENTIAL_BYTES = 64 * 1024 * 1024
+
+# PDFs with fewer pages than this are extracted in-process
+PDF_PARALLEL_MIN_PAGES = 16
+
+# Worker processes in each pipeline's PDF extraction pool
+PDF_MAX_WORKERS = os.cpu_count() or 1
+
+def _extract_pdf_page_range(args: Tuple[str, int, int]) -> List[str]:
+    """Extract text for pages [start, stop) of a PDF (runs in a worker process)"""
+    path, start, stop = args
+    reader = pypdf.PdfReader(path)
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+def _iter_pdf_page_texts(path: str, executor: Optional[ProcessPoolExecutor] = None) -> Iterator[str]:
+    """Yield PDF page texts in order, fanning large documents out over executor when given"""
+    reader = pypdf.PdfReader(path)
+    page_count = len(reader.pages)
+    workers = min(PDF_MAX_WORKERS, page_count // PDF_PARALLEL_MIN_PAGES) if executor else 0
+    
+    if workers <= 1:
+        for page in reader.pages:
+            yield page.extract_text()
+    else:
+        # Contiguous page ranges, so each worker parses the file only once
+        step = -(-page_count // workers)
+        ranges = [(path, start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        for page_texts in executor.map(_extract_pdf_page_range, ranges):
+            yield from page_texts
+
+def _extract_pdf_pages(path: str, executor: Optional[ProcessPoolExecutor] = None) -> str:
+    """Extract the full text of a PDF, one line break after each page"""
+    return "".join(text + "\n" for text in _iter_pdf_page_texts(path, executor))
+
+def _primitive_metadata(metadata: Dict[str, Any], exclude: Iterable[str] = ()) -> Dict[str, Any]:
+    """Keep only scalar metadata values, dropping nested data and excluded keys"""
+    return {
+        key: value for key, value in metadata.items()
+        if isinstance(value, (str, int, float, bool)) and key not in exclude
+    }
+
+def _slotted(cls):
+    """Rebuild a dataclass with __slots__ (dataclass(slots=True) needs Python 3.10)"""
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in field_names and key not in ('__dict__', '__weakref__')
+    }
+    cls_dict['__slots__'] = field_names
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+@_slotted
 @dataclass
 class DocumentChunk:
     content: str
@@ -40,6 +132,7 @@ class DocumentChunk:
         if self.metadata is None:
             self.metadata = {}
 
+@_slotted
 @dataclass
 class ProcessingStats:
     documents_processed: int = 0
@@ -47,11 +140,24 @@ class ProcessingStats:
     entities_extracted: int = 0
     relationships_created: int = 0
     embeddings_generated: int = 0
+    chunks_skipped: int = 0
     errors: List[str] = None
     
     def __post_init__(self):
         if self.errors is None:
             self.errors = []
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Flat copy of the counters, without asdict's recursive deep copy"""
+        return {
+            'documents_processed': self.documents_processed,
+            'chunks_created': self.chunks_created,
+            'entities_extracted': self.entities_extracted,
+            'relationships_created': self.relationships_created,
+            'embeddings_generated': self.embeddings_generated,
+            'chunks_skipped': self.chunks_skipped,
+            'errors': list(self.errors)
+        }
 
 class IngestionPipeline:
     """
@@ -71,7 +177,8 @@ class IngestionPipeline:
         weaviate_client: Optional[WeaviateClient] = None,
         embedding_service: Optional[EmbeddingService] = None,
         chunk_size: int = 1000,
-        chunk_overlap: int = 200
+        chunk_overlap: int = 200,
+        semantic_split_threshold: float = 0.3
     ):
         self.neo4j = neo4j_client or Neo4jClient()
         self.weaviate = weaviate_client or WeaviateClient()
@@ -79,10 +186,22 @@ class IngestionPipeline:
         
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        # Adjacent-sentence cosine similarity below which semantic chunking starts a new chunk
+        self.semantic_split_threshold = semantic_split_threshold
         
         # Initialize stats
         self.stats = ProcessingStats()
         
+        # blake2b(content) -> embedding, so repeated content is embedded once
+        self._embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        
+        # One PDF extraction pool reused across documents; workers start on first use.
+        # Spawned, not forked: this process already runs executor threads whose held
+        # locks a forked child would inherit.
+        self._pdf_executor = ProcessPoolExecutor(
+            max_workers=PDF_MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+        
     async def initialize(self):
         """Initialize all clients and create necessary schemas/indexes"""
         logger.info("Initializing ingestion pipeline...")
@@ -115,6 +234,16 @@ class IngestionPipeline:
             ["Document", "Entity", "Concept"],
             ["content", "title", "description"]
         )
+        
+        # Lookup index for skipping already-ingested chunk content
+        try:
+            async with self.neo4j.session() as session:
+                await session.run(
+                    "CREATE INDEX document_content_hash IF NOT EXISTS "
+                    "FOR (d:Document) ON (d.content_hash)"
+                )
+        except Exception as e:
+            logger.error(f"Failed to create content hash index: {e}")
     
     async def ingest_documents(
         self,
@@ -144,56 +273,68 @@ class IngestionPipeline:
         # Reset stats
         self.stats = ProcessingStats()
         
-        # Get all document files
+        # Stream document files; processing starts before the tree walk finishes
         if source_path.is_file():
-            files = [source_path]
+            files = iter([source_path])
         else:
             files = self._discover_files(source_path)
         
-        logger.info(f"Found {len(files)} files to process")
-        
-        # Process files in batches
-        chunk_batch = []
+        # Parse documents while earlier batches are embedded and indexed
+        queue_chunks: asyncio.Queue = asyncio.Queue(maxsize=INGEST_QUEUE_BATCHES)
         
-        for file_path in files:
+        async def produce():
+            chunk_batch = []
             try:
-                # Process single document
-                chunks = await self._process_document(
-                    file_path, 
-                    chunk_strategy, 
-                    domain, 
-                    metadata
-                )
-                
-                chunk_batch.extend(chunks)
-                self.stats.documents_processed += 1
+                for file_path in files:
+                    try:
+                        # Process single document
+                        chunks = await self._process_document(
+                            file_path, 
+                            chunk_strategy, 
+                            domain, 
+                            metadata
+                        )
+                        
+                        chunk_batch.extend(chunks)
+                        self.stats.documents_processed += 1
+                        
+                        # Hand the batch over when it reaches the limit
+                        if len(chunk_batch) >= batch_size:
+                            await queue_chunks.put(chunk_batch)
+                            chunk_batch = []
+                            
+                    except Exception as e:
+                        error_msg = f"Failed to process {file_path}: {str(e)}"
+                        logger.error(error_msg)
+                        self.stats.errors.append(error_msg)
                 
-                # Process batch when it reaches the limit
-                if len(chunk_batch) >= batch_size:
+                # Remaining chunks
+                if chunk_batch:
+                    await queue_chunks.put(chunk_batch)
+            finally:
+                await queue_chunks.put(None)
+        
+        async def consume():
+            while (chunk_batch := await queue_chunks.get()) is not None:
+                try:
                     await self._process_chunk_batch(chunk_batch)
-                    chunk_batch = []
-                    
-            except Exception as e:
-                error_msg = f"Failed to process {file_path}: {str(e)}"
-                logger.error(error_msg)
-                self.stats.errors.append(error_msg)
+                except Exception as e:
+                    error_msg = f"Failed to index batch of {len(chunk_batch)} chunks: {str(e)}"
+                    logger.error(error_msg)
+                    self.stats.errors.append(error_msg)
         
-        # Process remaining chunks
-        if chunk_batch:
-            await self._process_chunk_batch(chunk_batch)
+        await asyncio.gather(produce(), consume())
         
-        logger.info(f"Ingestion completed: {asdict(self.stats)}")
+        logger.info(f"Processed {self.stats.documents_processed} files")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Ingestion completed: %s", self.stats.snapshot())
         return self.stats
     
-    def _discover_files(self, directory: Path) -> List[Path]:
-        """Discover supported file types in directory"""
-        supported_extensions = {'.txt', '.pdf', '.docx', '.json', '.md'}
-        files = []
-        
-        for ext in supported_extensions:
-            files.extend(directory.rglob(f'*{ext}'))
-        
-        return sorted(files)
+    def _discover_files(self, directory: Path) -> Iterator[Path]:
+        """Discover supported file types in directory with a single tree walk"""
+        for path in directory.rglob('*'):
+            if path.suffix.lower() in SUPPORTED_EXTENSIONS and path.is_file():
+                yield path
     
     async def _process_document(
         self,
@@ -206,70 +347,78 @@ class IngestionPipeline:
         
         logger.info(f"Processing document: {file_path.name}")
         
-        # Extract text from document
-        content = await self._extract_text(file_path)
-        if not content:
-            return []
-        
         # Generate document ID
-        doc_id = hashlib.md5(str(file_path).encode()).hexdigest()
-        
-        # Create chunks
-        if chunk_strategy == "semantic":
-            chunks = await self._semantic_chunking(content)
-        elif chunk_strategy == "paragraph":
-            chunks = self._paragraph_chunking(content)
-        else:  # fixed
-            chunks = self._fixed_size_chunking(content)
-        
-        # Create DocumentChunk objects
-        document_chunks = []
-        for i, chunk_content in enumerate(chunks):
-            metadata = (base_metadata or {}).copy()
-            metadata.update({
-                'file_path': str(file_path),
-                'file_name': file_path.name,
-                'file_extension': file_path.suffix,
-                'file_size': file_path.stat().st_size,
-                'processed_at': datetime.utcnow().isoformat(),
-                'total_chunks': len(chunks)
-            })
+        doc_id = hashlib.blake2b(str(file_path).encode(), digest_size=16).hexdigest()
+        
+        # Create chunks; the synchronous chunkers run off the event loop
+        if chunk_strategy not in ("semantic", "paragraph") and file_path.suffix.lower() == '.pdf':
+            # Fixed-size PDF chunks are cut page by page, never holding the whole text
+            chunks = await asyncio.to_thread(self._stream_pdf_fixed_size_chunks, file_path)
+        else:
+            # Extract text from document
+            content = await self._extract_text(file_path)
+            if not content:
+                return []
             
-            document_chunk = DocumentChunk(
+            if chunk_strategy == "semantic":
+                chunks = await self._semantic_chunking(content)
+            elif chunk_strategy == "paragraph":
+                chunks = await asyncio.to_thread(self._paragraph_chunking, content)
+            else:  # fixed
+                chunks = await asyncio.to_thread(self._fixed_size_chunking, content)
+        
+        if not chunks:
+            return []
+        
+        # Per-document fields are computed once, not per chunk
+        source = str(file_path)
+        title = file_path.stem
+        document_type = file_path.suffix[1:]  # Remove dot
+        document_metadata = {
+            **(base_metadata or {}),
+            'file_path': source,
+            'file_name': file_path.name,
+            'file_extension': file_path.suffix,
+            'file_size': file_path.stat().st_size,
+            'processed_at': datetime.utcnow().isoformat(),
+            'total_chunks': len(chunks)
+        }
+        if domain:
+            document_metadata['domain'] = domain
+        
+        # Create DocumentChunk objects, each with its own metadata dict
+        document_chunks = [
+            DocumentChunk(
                 content=chunk_content,
-                title=file_path.stem,
+                title=title,
                 chunk_index=i,
                 parent_document_id=doc_id,
-                document_type=file_path.suffix[1:],  # Remove dot
-                source=str(file_path),
-                metadata=metadata
+                document_type=document_type,
+                source=source,
+                metadata=document_metadata.copy()
             )
-            
-            if domain:
-                document_chunk.metadata['domain'] = domain
-            
-            document_chunks.append(document_chunk)
+            for i, chunk_content in enumerate(chunks)
+        ]
         
         logger.info(f"Created {len(document_chunks)} chunks from {file_path.name}")
         return document_chunks
     
     async def _extract_text(self, file_path: Path) -> str:
-        """Extract text from various file formats"""
+        """Extract text from various file formats without blocking the event loop"""
+        return await asyncio.to_thread(self._extract_text_sync, file_path)
+    
+    def _extract_text_sync(self, file_path: Path) -> str:
+        """Extract text from various file formats (blocking; runs in a worker thread)"""
         
         try:
             if file_path.suffix.lower() == '.txt' or file_path.suffix.lower() == '.md':
-                return file_path.read_text(encoding='utf-8')
+                return self._read_text_file(file_path)
             
             elif file_path.suffix.lower() == '.pdf':
                 if not DOCUMENT_PROCESSING_AVAILABLE:
                     raise ImportError("pypdf not available for PDF processing")
                 
-                text = ""
-                with open(file_path, 'rb') as file:
-                    reader = pypdf.PdfReader(file)
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n"
-                return text
+                return _extract_pdf_pages(str(file_path), self._pdf_executor)
             
             elif file_path.suffix.lower() == '.docx':
                 if not DOCUMENT_PROCESSING_AVAILABLE:
@@ -297,21 +446,74 @@ class IngestionPipeline:
             logger.error(f"Text extraction failed for {file_path}: {e}")
             return ""
     
+    def _read_text_file(self, file_path: Path) -> str:
+        """Read a UTF-8 text file, memory-mapping it unless it is tiny"""
+        
+        with open(file_path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < MMAP_MIN_BYTES:
+                text = file.read().decode('utf-8')
+            else:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if size >= MMAP_SEQUENTIAL_BYTES and hasattr(mm, 'madvise'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    text = mm[:].decode('utf-8')
+        
+        # Binary reads skip universal newlines, so normalize line endings as read_text would
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+    
     def _fixed_size_chunking(self, text: str) -> List[str]:
         """Split text into fixed-size chunks with overlap"""
         
         words = text.split()
-        chunks = []
+        if not words:
+            return []
+        
+        # Join once and slice by character offsets instead of re-joining each window
+        full_text = ' '.join(words)
+        word_ends = np.cumsum([len(word) + 1 for word in words]) - 1
+        word_starts = word_ends - [len(word) for word in words]
         
+        chunks = []
         for i in range(0, len(words), self.chunk_size - self.chunk_overlap):
-            chunk_words = words[i:i + self.chunk_size]
-            chunk_text = ' '.join(chunk_words)
-            
-            if chunk_text.strip():
-                chunks.append(chunk_text.strip())
+            last = min(i + self.chunk_size, len(words)) - 1
+            chunks.append(full_text[word_starts[i]:word_ends[last]])
         
         return chunks
     
+    def _iter_fixed_size_chunks(self, texts: Iterable[str]) -> Iterator[str]:
+        """Fixed-size chunks with overlap over a stream of texts (e.g. PDF pages)
+        
+        Yields the same chunks as _fixed_size_chunking on the texts joined by
+        line breaks, while buffering at most one window plus one text of words.
+        """
+        stride = self.chunk_size - self.chunk_overlap
+        window: List[str] = []
+        
+        for text in texts:
+            window.extend(text.split())
+            while len(window) >= self.chunk_size:
+                yield ' '.join(window[:self.chunk_size])
+                del window[:stride]
+        
+        # Trailing (possibly overlapping) partial windows
+        while window:
+            yield ' '.join(window[:self.chunk_size])
+            del window[:stride]
+    
+    def _stream_pdf_fixed_size_chunks(self, file_path: Path) -> List[str]:
+        """Fixed-size chunks of a PDF, cut while pages are extracted"""
+        
+        try:
+            if not DOCUMENT_PROCESSING_AVAILABLE:
+                raise ImportError("pypdf not available for PDF processing")
+            
+            return list(self._iter_fixed_size_chunks(_iter_pdf_page_texts(str(file_path), self._pdf_executor)))
+            
+        except Exception as e:
+            logger.error(f"Text extraction failed for {file_path}: {e}")
+            return []
+    
     def _paragraph_chunking(self, text: str) -> List[str]:
         """Split text into chunks based on paragraphs"""
         
@@ -341,17 +543,31 @@ class IngestionPipeline:
         if len(sentences) <= 1:
             return [text]
         
-        # Generate embeddings for sentences
-        sentence_embeddings = await self.embedding_service.embed_texts(sentences)
+        # Generate embeddings for sentences, batched in length order to limit padding
+        order = np.argsort([len(sentence) for sentence in sentences], kind='stable')
+        sorted_embeddings = await self.embedding_service.embed_texts([sentences[i] for i in order])
+        sentence_embeddings = np.empty_like(sorted_embeddings)
+        sentence_embeddings[order] = sorted_embeddings
+        
+        # Cosine similarity between each sentence and the next
+        norms = np.linalg.norm(sentence_embeddings, axis=1, keepdims=True)
+        normalized = sentence_embeddings / np.where(norms == 0, 1.0, norms)
+        adjacent_similarity = np.einsum('ij,ij->i', normalized[:-1], normalized[1:])
+        
+        # Zero vectors (failed embeddings) never force a split
+        has_embedding = norms[:, 0] > 0
+        adjacent_similarity[~(has_embedding[:-1] & has_embedding[1:])] = 1.0
         
         # Group semantically similar sentences
         chunks = []
         current_chunk_sentences = []
         current_chunk_length = 0
         
-        for i, (sentence, embedding) in enumerate(zip(sentences, sentence_embeddings)):
-            # Check if adding this sentence would exceed chunk size
-            if current_chunk_length + len(sentence) > self.chunk_size and current_chunk_sentences:
+        for i, sentence in enumerate(sentences):
+            # Start a new chunk on a topic shift or when the chunk would exceed its size
+            topic_shift = i > 0 and adjacent_similarity[i - 1] < self.semantic_split_threshold
+            too_long = current_chunk_length + len(sentence) > self.chunk_size
+            if current_chunk_sentences and (topic_shift or too_long):
                 # Finalize current chunk
                 chunks.append(' '.join(current_chunk_sentences))
                 current_chunk_sentences = []
@@ -369,27 +585,47 @@ class IngestionPipeline:
     def _split_sentences(self, text: str) -> List[str]:
         """Simple sentence splitting"""
         # Basic sentence splitting - could be enhanced with proper NLP
-        import re
-        
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        return sentences
+        stripped = (match.group().strip() for match in SENTENCE_PATTERN.finditer(text))
+        return [sentence for sentence in stripped if sentence]
     
     async def _process_chunk_batch(self, chunks: List[DocumentChunk]):
         """Process a batch of chunks"""
         
         logger.info(f"Processing batch of {len(chunks)} chunks")
         
+        # Whitespace-only chunks (e.g. blank PDF pages) are neither embedded nor written
+        chunks = [chunk for chunk in chunks if chunk.content.strip()]
+        if not chunks:
+            return
+        
+        # Content already in the graph is linked to its parent, not re-embedded or re-written
+        hashes = [hashlib.blake2b(chunk.content.encode(), digest_size=16).hexdigest() for chunk in chunks]
+        ingested = await self._find_ingested_hashes(hashes)
+        if ingested:
+            await self._link_ingested_chunks(
+                [(chunk, h) for chunk, h in zip(chunks, hashes) if h in ingested]
+            )
+            new_chunks = [(chunk, h) for chunk, h in zip(chunks, hashes) if h not in ingested]
+            self.stats.chunks_skipped += len(chunks) - len(new_chunks)
+            logger.info(f"Skipping {len(chunks) - len(new_chunks)} already-ingested chunks")
+            if not new_chunks:
+                return
+            chunks = [chunk for chunk, _ in new_chunks]
+            hashes = [h for _, h in new_chunks]
+        
         # Generate embeddings for all chunks
         chunk_texts = [chunk.content for chunk in chunks]
-        embeddings = await self.embedding_service.embed_texts(chunk_texts)
+        embeddings = await self._embed_deduplicated(chunk_texts)
         
         # Prepare data for dual indexing
-        neo4j_tasks = []
+        vectors = []
         weaviate_docs = []
         
         for chunk, embedding in zip(chunks, embeddings):
+            # Both stores take plain lists, so convert each matrix row once
+            vector = embedding.tolist()
+            vectors.append(vector)
+            
             # Add to Weaviate
             weaviate_doc = {
                 'content': chunk.content,
@@ -398,17 +634,15 @@ class IngestionPipeline:
                 'source': chunk.source,
                 'document_type': chunk.document_type,
                 'domain': chunk.metadata.get('domain', ''),
-                'metadata': chunk.metadata
+                'metadata': _primitive_metadata(chunk.metadata, WEAVIATE_PROMOTED_METADATA),
+                'vector': vector
             }
             weaviate_docs.append(weaviate_doc)
-            
-            # Prepare Neo4j insertion
-            neo4j_tasks.append(self._add_to_neo4j(chunk, embedding))
         
         # Execute dual indexing
         await asyncio.gather(
             self.weaviate.batch_add_documents(weaviate_docs),
-            *neo4j_tasks
+            self._add_chunks_to_neo4j(chunks, vectors, hashes)
         )
         
         # Update stats
@@ -417,50 +651,169 @@ class IngestionPipeline:
         
         logger.info(f"Batch processed successfully")
     
-    async def _add_to_neo4j(self, chunk: DocumentChunk, embedding: List[float]):
-        """Add chunk to Neo4j with relationships"""
+    async def _embed_deduplicated(self, texts: List[str]) -> np.ndarray:
+        """Embed each distinct text once, reusing embeddings from earlier batches"""
+        
+        if not texts:
+            return await self.embedding_service.embed_texts(texts)
+        
+        keys = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+        
+        found: Dict[bytes, np.ndarray] = {}
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key in self._embedding_cache:
+                self._embedding_cache.move_to_end(key)
+                found[key] = self._embedding_cache[key]
+            elif key not in missing:
+                missing[key] = text
+        
+        if missing:
+            new_embeddings = await self._embed_micro_batched(list(missing.values()))
+            for key, embedding in zip(missing, new_embeddings):
+                found[key] = embedding
+                self._embedding_cache[key] = embedding
+            
+            while len(self._embedding_cache) > EMBED_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+        
+        return np.stack([found[key] for key in keys])
+    
+    async def _embed_micro_batched(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as length-sorted micro-batches running concurrently"""
+        
+        if not texts:
+            return await self.embedding_service.embed_texts(texts)
         
-        # Create document node with embedding
+        # Sorting by length keeps similarly sized texts in the same slab
+        order = np.argsort([len(text) for text in texts], kind='stable')
+        slabs = [order[i:i + EMBED_MICRO_BATCH] for i in range(0, len(order), EMBED_MICRO_BATCH)]
+        semaphore = asyncio.Semaphore(EMBED_MAX_CONCURRENCY)
+        
+        async def embed_slab(slab: np.ndarray) -> np.ndarray:
+            async with semaphore:
+                return await self.embedding_service.embed_texts([texts[i] for i in slab])
+        
+        slab_embeddings = await asyncio.gather(*(embed_slab(slab) for slab in slabs))
+        
+        # Undo the length sort
+        sorted_embeddings = np.concatenate(slab_embeddings)
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
+        return embeddings
+    
+    async def _find_ingested_hashes(self, hashes: List[str]) -> set:
+        """Return the content hashes that already have a Document node"""
+        
+        query = """
+        UNWIND $hashes AS h
+        MATCH (d:Document {content_hash: h})
+        RETURN DISTINCT h
+        """
+        
+        try:
+            async with self.neo4j.session() as session:
+                result = await session.run(query, hashes=list(set(hashes)))
+                return {record["h"] async for record in result}
+        except Exception as e:
+            # Without the lookup every chunk is treated as new
+            logger.error(f"Content hash lookup failed: {e}")
+            return set()
+    
+    async def _link_ingested_chunks(self, chunks: List[Tuple[DocumentChunk, str]]):
+        """Attach already-ingested chunk content to the current parent document"""
+        
+        link_query = """
+        UNWIND $rows AS row
+        MATCH (d:Document {content_hash: row.content_hash})
+        MERGE (parent:Document {id: row.parent_id, is_parent: true})
+        SET parent.title = row.title,
+            parent.document_type = row.document_type,
+            parent.source = row.source
+        
+        MERGE (d)-[:PART_OF]->(parent)
+        """
+        
+        rows = [
+            {
+                'content_hash': content_hash,
+                'parent_id': chunk.parent_document_id,
+                'title': chunk.title,
+                'document_type': chunk.document_type,
+                'source': chunk.source
+            }
+            for chunk, content_hash in chunks
+        ]
+        
+        try:
+            async with self.neo4j.session() as session:
+                await session.run(link_query, rows=rows)
+        except Exception as e:
+            logger.error(f"Failed to link ingested chunks in Neo4j: {e}")
+            self.stats.errors.append(f"Neo4j link error: {str(e)}")
+    
+    async def _add_chunks_to_neo4j(
+        self,
+        chunks: List[DocumentChunk],
+        embeddings: List[List[float]],
+        content_hashes: List[str]
+    ):
+        """Add a batch of chunks to Neo4j with relationships in one UNWIND query"""
+        
+        # Create document nodes with embeddings
         create_query = """
-        MERGE (d:Document {id: $chunk_id})
-        SET d.content = $content,
-            d.title = $title,
-            d.chunk_index = $chunk_index,
-            d.parent_document_id = $parent_id,
-            d.document_type = $document_type,
-            d.source = $source,
-            d.domain = $domain,
-            d.embedding = $embedding,
+        UNWIND $rows AS row
+        MERGE (d:Document {id: row.chunk_id})
+        SET d.content = row.content,
+            d.title = row.title,
+            d.chunk_index = row.chunk_index,
+            d.parent_document_id = row.parent_id,
+            d.document_type = row.document_type,
+            d.source = row.source,
+            d.domain = row.domain,
             d.created_at = $created_at,
-            d.metadata = $metadata
+            d.metadata = row.metadata,
+            d.content_hash = row.content_hash
+        
+        // Store the embedding as a float32 vector property, not a list of 64-bit floats
+        WITH d, row
+        CALL db.create.setNodeVectorProperty(d, 'embedding', row.embedding)
         
         // Create parent document relationship
-        MERGE (parent:Document {id: $parent_id, is_parent: true})
-        SET parent.title = $title,
-            parent.document_type = $document_type,
-            parent.source = $source
+        MERGE (parent:Document {id: row.parent_id, is_parent: true})
+        SET parent.title = row.title,
+            parent.document_type = row.document_type,
+            parent.source = row.source
         
         MERGE (d)-[:PART_OF]->(parent)
         """
         
+        rows = [
+            {
+                'chunk_id': f"{chunk.parent_document_id}_{chunk.chunk_index}",
+                'content': chunk.content,
+                'title': chunk.title,
+                'chunk_index': chunk.chunk_index,
+                'parent_id': chunk.parent_document_id,
+                'document_type': chunk.document_type,
+                'source': chunk.source,
+                'domain': chunk.metadata.get('domain', ''),
+                'embedding': embedding,
+                'metadata': chunk.metadata,
+                'content_hash': content_hash
+            }
+            for chunk, embedding, content_hash in zip(chunks, embeddings, content_hashes)
+        ]
+        
         try:
             async with self.neo4j.session() as session:
                 await session.run(
                     create_query,
-                    chunk_id=f"{chunk.parent_document_id}_{chunk.chunk_index}",
-                    content=chunk.content,
-                    title=chunk.title,
-                    chunk_index=chunk.chunk_index,
-                    parent_id=chunk.parent_document_id,
-                    document_type=chunk.document_type,
-                    source=chunk.source,
-                    domain=chunk.metadata.get('domain', ''),
-                    embedding=embedding,
-                    created_at=datetime.utcnow().isoformat(),
-                    metadata=chunk.metadata
+                    rows=rows,
+                    created_at=datetime.utcnow().isoformat()
                 )
         except Exception as e:
-            logger.error(f"Failed to add chunk to Neo4j: {e}")
+            logger.error(f"Failed to add chunks to Neo4j: {e}")
             self.stats.errors.append(f"Neo4j insertion error: {str(e)}")
     
     async def ingest_structured_data(
@@ -481,170 +834,165 @@ class IngestionPipeline:
         if isinstance(data, dict):
             data = [data]
         
-        # Process each record
-        for i, record in enumerate(data):
-            try:
-                await self._process_structured_record(
-                    record, 
-                    f"{source_name}_{i}",
-                    extract_relationships,
-                    domain
-                )
-                self.stats.documents_processed += 1
-                
-            except Exception as e:
-                error_msg = f"Failed to process record {i}: {str(e)}"
-                logger.error(error_msg)
-                self.stats.errors.append(error_msg)
+        # Convert records to searchable content and embed them in one call
+        contents = [self._record_to_text(record) for record in data]
+        embeddings = await self._embed_records(contents)
+        
+        # Write groups of records concurrently, one Weaviate batch and one Cypher query each
+        semaphore = asyncio.Semaphore(STRUCTURED_MAX_CONCURRENCY)
+        processed_at = datetime.utcnow().isoformat()
+        
+        async def write_group(start: int):
+            stop = min(start + STRUCTURED_BATCH_SIZE, len(data))
+            async with semaphore:
+                try:
+                    await self._process_structured_group(
+                        data[start:stop],
+                        [f"{source_name}_{i}" for i in range(start, stop)],
+                        contents[start:stop],
+                        embeddings[start:stop],
+                        extract_relationships,
+                        domain,
+                        processed_at
+                    )
+                    self.stats.documents_processed += stop - start
+                    
+                except Exception as e:
+                    error_msg = f"Failed to process records {start}-{stop - 1}: {str(e)}"
+                    logger.error(error_msg)
+                    self.stats.errors.append(error_msg)
+        
+        await asyncio.gather(*(write_group(start) for start in range(0, len(data), STRUCTURED_BATCH_SIZE)))
         
-        logger.info(f"Structured data ingestion completed: {asdict(self.stats)}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Structured data ingestion completed: %s", self.stats.snapshot())
         return self.stats
     
-    async def _process_structured_record(
+    async def _embed_records(self, contents: List[str]) -> np.ndarray:
+        """Embed record texts, giving records without text a zero vector"""
+        
+        embeddings = np.zeros((len(contents), self.embedding_service.get_dimensions()), dtype=np.float32)
+        non_empty = [i for i, content in enumerate(contents) if content.strip()]
+        if non_empty:
+            embeddings[non_empty] = await self._embed_deduplicated([contents[i] for i in non_empty])
+        return embeddings
+    
+    async def _process_structured_group(
         self,
-        record: Dict,
-        record_id: str,
+        records: List[Dict],
+        record_ids: List[str],
+        contents: List[str],
+        embeddings: np.ndarray,
         extract_relationships: bool,
-        domain: Optional[str]
+        domain: Optional[str],
+        processed_at: str
     ):
-        """Process a single structured data record"""
+        """Index a group of structured records in Weaviate and Neo4j"""
         
-        # Convert record to searchable content
-        content = self._record_to_text(record)
+        # Both stores take plain lists, so convert the group once
+        vectors = embeddings.tolist()
         
-        # Generate embedding
-        embedding = await self.embedding_service.embed_text(content)
-        
-        # Add to Weaviate
-        await self.weaviate.add_document(
-            content=content,
-            title=record.get('title', record_id),
-            entity_id=record_id,
-            metadata={
+        weaviate_docs = [
+            {
+                'content': content,
+                'title': record.get('title', record_id),
+                'entity_id': record_id,
                 'source': 'structured_data',
-                'domain': domain,
-                'original_record': record,
-                'processed_at': datetime.utcnow().isoformat()
+                'domain': domain or '',
+                # The full record stays on the Neo4j node; Weaviate gets its scalar fields
+                'metadata': {**_primitive_metadata(record), 'processed_at': processed_at},
+                'vector': vector
             }
-        )
+            for record, record_id, content, vector in zip(records, record_ids, contents, vectors)
+        ]
+        
+        rows = [
+            {
+                'record_id': record_id,
+                'content': content,
+                'embedding': vector,
+                'metadata': record,
+                'entities': self._extract_record_entities(record) if extract_relationships else []
+            }
+            for record, record_id, content, vector in zip(records, record_ids, contents, vectors)
+        ]
         
-        # Add to Neo4j with relationships
-        if extract_relationships:
-            await self._extract_and_create_relationships(record, record_id, embedding, domain)
-        else:
-            await self._add_simple_node(record, record_id, embedding, domain)
+        await asyncio.gather(
+            self.weaviate.batch_add_documents(weaviate_docs),
+            self._add_records_to_neo4j(rows, extract_relationships, domain)
+        )
         
-        self.stats.chunks_created += 1
-        self.stats.embeddings_generated += 1
+        self.stats.chunks_created += len(records)
+        self.stats.embeddings_generated += len(records)
     
     def _record_to_text(self, record: Dict) -> str:
         """Convert structured record to searchable text"""
         
-        text_parts = []
-        
-        # Add title/name if available
-        for title_field in ['title', 'name', 'subject', 'heading']:
-            if title_field in record:
-                text_parts.append(f"{title_field.capitalize()}: {record[title_field]}")
-        
-        # Add description/content fields
-        for content_field in ['description', 'content', 'summary', 'body']:
-            if content_field in record:
-                text_parts.append(str(record[content_field]))
-        
-        # Add other relevant fields
-        for key, value in record.items():
-            if key not in ['title', 'name', 'subject', 'heading', 'description', 'content', 'summary', 'body']:
-                if isinstance(value, (str, int, float)):
-                    text_parts.append(f"{key}: {value}")
+        # Title/name fields first, then description/content fields, then other scalars
+        title_parts = [f"{label}: {record[field]}" for field, label in RECORD_TITLE_FIELDS if field in record]
+        content_parts = [str(record[field]) for field in RECORD_CONTENT_FIELDS if field in record]
+        other_parts = (
+            f"{key}: {value}" for key, value in record.items()
+            if key not in RECORD_TEXT_FIELDS and isinstance(value, (str, int, float))
+        )
         
-        return '\n'.join(text_parts)
+        return '\n'.join(chain(title_parts, content_parts, other_parts))
     
-    async def _extract_and_create_relationships(
+    def _extract_record_entities(self, record: Dict) -> List[Dict[str, str]]:
+        """Extract likely entity names (short string values) from a record"""
+        # This is a simplified version - could be enhanced with NER
+        return [
+            {'name': value, 'type': key}
+            for key, value in record.items()
+            if isinstance(value, str) and len(value.split()) <= 5
+        ]
+    
+    async def _add_records_to_neo4j(
         self,
-        record: Dict,
-        record_id: str,
-        embedding: List[float],
+        rows: List[Dict[str, Any]],
+        extract_relationships: bool,
         domain: Optional[str]
     ):
-        """Extract entities and relationships from structured data"""
+        """Create Record nodes (and entity relationships) for a group in one UNWIND query"""
         
-        # This is a simplified version - could be enhanced with NER
-        relationships_query = """
+        records_query = """
+        UNWIND $rows AS row
         CREATE (r:Record {
-            id: $record_id,
-            content: $content,
-            embedding: $embedding,
+            id: row.record_id,
+            content: row.content,
             domain: $domain,
             created_at: $created_at,
-            metadata: $metadata
+            metadata: row.metadata
         })
+        WITH r, row
+        CALL db.create.setNodeVectorProperty(r, 'embedding', row.embedding)
+        """
         
-        // Create entity nodes and relationships based on record structure
-        WITH r
-        UNWIND $entities as entity
+        if extract_relationships:
+            # Create entity nodes and relationships based on record structure
+            records_query += """
+        WITH r, row
+        UNWIND row.entities AS entity
         MERGE (e:Entity {name: entity.name, type: entity.type})
         CREATE (r)-[:MENTIONS]->(e)
         """
         
-        # Extract entities from record
-        entities = []
-        for key, value in record.items():
-            if isinstance(value, str) and len(value.split()) <= 5:  # Likely entity names
-                entities.append({'name': value, 'type': key})
-        
         try:
             async with self.neo4j.session() as session:
                 await session.run(
-                    relationships_query,
-                    record_id=record_id,
-                    content=self._record_to_text(record),
-                    embedding=embedding,
+                    records_query,
+                    rows=rows,
                     domain=domain,
-                    created_at=datetime.utcnow().isoformat(),
-                    metadata=record,
-                    entities=entities
+                    created_at=datetime.utcnow().isoformat()
                 )
             
-            self.stats.entities_extracted += len(entities)
-            self.stats.relationships_created += len(entities)
+            entity_count = sum(len(row['entities']) for row in rows)
+            self.stats.entities_extracted += entity_count
+            self.stats.relationships_created += entity_count
             
         except Exception as e:
-            logger.error(f"Failed to create relationships for {record_id}: {e}")
-    
-    async def _add_simple_node(
-        self,
-        record: Dict,
-        record_id: str,
-        embedding: List[float],
-        domain: Optional[str]
-    ):
-        """Add record as simple node without relationship extraction"""
-        
-        simple_query = """
-        CREATE (r:Record {
-            id: $record_id,
-            content: $content,
-            embedding: $embedding,
-            domain: $domain,
-            created_at: $created_at,
-            metadata: $metadata
-        })
-        """
-        
-        try:
-            async with self.neo4j.session() as session:
-                await session.run(
-                    simple_query,
-                    record_id=record_id,
-                    content=self._record_to_text(record),
-                    embedding=embedding,
-                    domain=domain,
-                    created_at=datetime.utcnow().isoformat(),
-                    metadata=record
-                )
-        except Exception as e:
-            logger.error(f"Failed to add record {record_id}: {e}")
+            logger.error(f"Failed to add {len(rows)} records to Neo4j: {e}")
+            self.stats.errors.append(f"Neo4j insertion error: {str(e)}")
     
     async def get_ingestion_stats(self) -> Dict[str, Any]:
         """Get comprehensive ingestion statistics"""
@@ -654,7 +1002,7 @@ class IngestionPipeline:
         weaviate_count = await self.weaviate.get_document_count()
         
         return {
-            'processing_stats': asdict(self.stats),
+            'processing_stats': self.stats.snapshot(),
             'neo4j_stats': neo4j_stats,
             'weaviate_document_count': weaviate_count,
             'embedding_model': self.embedding_service.get_model_info(),
@@ -664,4 +1012,6 @@ class IngestionPipeline:
     async def cleanup(self):
         """Clean up resources"""
         await self.neo4j.close()
-        await self.weaviate.close()
\ No newline at end of file
+        await self.weaviate.close()
+        await self.embedding_service.close()
+        await asyncio.to_thread(self._pdf_executor.shutdown)
\ No newline at end of file
@@ -4,26 +4,84 @@ for optimal semantic search + graph traversal performance.
 """
 
 import asyncio
+import hashlib
+import heapq
+import math
+import re
 import time
-from typing import Dict, List, Optional, Union, Literal
+from collections import Counter
+from typing import Dict, List, Optional, Set, Union, Literal
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
+# Optional JIT compilation for the fusion kernel
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 from src.clients.neo4j_client import Neo4jClient
 from src.clients.weaviate_client import WeaviateClient
 from src.utils.logger import get_logger
-from src.utils.cache import CacheManager
+from src.utils.cache import SEARCH_KEY_PREFIX, CacheManager, canonical_dumps, dumps, loads
 
 logger = get_logger(__name__)
 
+# Reciprocal Rank Fusion smoothing constant
+RRF_K = 60
+
+# Adaptive result TTL: first-seen queries get the base, repeats up to ADAPTIVE_TTL_MAX_FACTOR times it
+ADAPTIVE_TTL_BASE = 900
+ADAPTIVE_TTL_MAX_FACTOR = 8
+# Distinct cache keys tracked for query frequency before the counts start over
+QUERY_FREQUENCY_MAX_KEYS = 10_000
+
+# Negative cache of queries known to return nothing: key count and maximum age (seconds)
+EMPTY_QUERY_CACHE_CAPACITY = 10_000
+EMPTY_QUERY_CACHE_MAX_AGE = 600
+
+# Query words that signal graph vs semantic intent, matched at word starts in one scan each
+GRAPH_KEYWORDS = ('relationship', 'connected', 'related', 'impact', 'cause', 'effect', 'network')
+SEMANTIC_KEYWORDS = ('similar', 'like', 'meaning', 'concept', 'understanding')
+GRAPH_KEYWORD_PATTERN = re.compile(r"\b(?:" + "|".join(map(re.escape, GRAPH_KEYWORDS)) + ")")
+SEMANTIC_KEYWORD_PATTERN = re.compile(r"\b(?:" + "|".join(map(re.escape, SEMANTIC_KEYWORDS)) + ")")
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _rrf_scores(inverse, contributions, n_unique):
+        """Sum each document's RRF contributions in one compiled scatter-add loop"""
+        scores = np.zeros(n_unique)
+        for i in range(inverse.shape[0]):
+            scores[inverse[i]] += contributions[i]
+        return scores
+else:
+    def _rrf_scores(inverse, contributions, n_unique):
+        """Sum each document's RRF contributions"""
+        return np.bincount(inverse, weights=contributions, minlength=n_unique)
+
+def _mean_score(results: List[Dict]) -> float:
+    """Average 'score' of a result list, 0.0 when empty"""
+    if not results:
+        return 0.0
+    return float(np.fromiter((r.get('score', 0) for r in results), float, count=len(results)).mean())
+
 class SearchStrategy(str, Enum):
     SEMANTIC_FIRST = "semantic_first"
     GRAPH_FIRST = "graph_first" 
     BALANCED = "balanced"
     MULTI_STEP = "multi_step"
 
-@dataclass
+@dataclass(frozen=True)
 class SearchResult:
+    """Immutable search outcome; fixed slots keep the per-result footprint small"""
+    __slots__ = (
+        'query', 'strategy', 'results', 'sources', 'metadata',
+        'execution_time', 'confidence_score'
+    )
+    
     query: str
     strategy: SearchStrategy
     results: List[Dict]
@@ -32,11 +90,28 @@ class SearchResult:
     execution_time: float
     confidence_score: float
     
+    def to_dict(self) -> Dict:
+        """Plain JSON-native form, so serializers never fall back to a default hook"""
+        return {
+            'query': self.query,
+            'strategy': self.strategy.value,
+            'results': self.results,
+            'sources': self.sources,
+            'metadata': self.metadata,
+            'execution_time': float(self.execution_time),
+            'confidence_score': float(self.confidence_score)
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SearchResult":
+        """Rebuild a result from its cached dict form"""
+        return cls(**{**data, 'strategy': SearchStrategy(data['strategy'])})
+    
     @property
     def summary(self) -> str:
         return f"Found {len(self.results)} results in {self.execution_time:.2f}s using {self.strategy.value} strategy"
 
-@dataclass
+@dataclass(frozen=True)
 class HybridConfig:
     semantic_weight: float = 0.5
     graph_weight: float = 0.5
@@ -44,6 +119,10 @@ class HybridConfig:
     max_hops: int = 2
     max_results: int = 50
     enable_caching: bool = True
+    # Semantic-first search runs vector lookup + expansion as one Cypher query on Neo4j's index
+    use_neo4j_vector: bool = False
+    # Balanced search fuses whatever finished within this budget (None waits for both backends)
+    soft_timeout_ms: Optional[int] = None
     fusion_strategy: Literal["reciprocal_rank", "weighted", "linear"] = "reciprocal_rank"
 
 class HybridSearchOrchestrator:
@@ -69,6 +148,25 @@ class HybridSearchOrchestrator:
         self.cache = cache_manager or CacheManager()
         self.config = config or HybridConfig()
         
+        # Fusion method bound once from config rather than dispatched per call
+        self._fuse = {
+            "reciprocal_rank": self._reciprocal_rank_fusion,
+            "weighted": self._weighted_fusion,
+            "linear": self._linear_fusion
+        }.get(self.config.fusion_strategy, self._linear_fusion)
+        
+        # Per-cache-key request counts, for scaling result TTLs with popularity
+        self._query_frequency: Counter = Counter()
+        
+        # Cache keys whose search came back empty; an exact set, since a false positive would
+        # answer a query that has results with nothing. Rebuilt periodically so new data shows up
+        self._empty_queries: Set[str] = set()
+        self._empty_queries_since = time.monotonic()
+        
+        # Compile the fusion kernel now rather than on the first query
+        if NUMBA_AVAILABLE:
+            _rrf_scores(np.zeros(1, dtype=np.intp), np.zeros(1), 1)
+        
     async def search(
         self,
         query: str,
@@ -96,23 +194,45 @@ class HybridSearchOrchestrator:
         # Check cache first
         cache_key = self._generate_cache_key(query, strategy, context_domains, filters)
         if self.config.enable_caching:
-            cached_result = await self.cache.get(cache_key)
+            self._track_query_frequency(cache_key)
+            
+            # Known-empty queries are answered without touching Redis or the stores
+            if self._is_known_empty(cache_key):
+                logger.info(f"Negative cache hit for query: {query[:50]}...")
+                return SearchResult(
+                    query=query,
+                    strategy=strategy,
+                    results=[],
+                    sources={},
+                    metadata={'negative_cache': True},
+                    execution_time=time.time() - start_time,
+                    confidence_score=0.0
+                )
+            
+            cached_result = await self.cache.get_bytes(cache_key)
             if cached_result:
                 logger.info(f"Cache hit for query: {query[:50]}...")
-                return cached_result
+                return SearchResult.from_dict(loads(cached_result))
         
         # Execute search based on strategy
         logger.info(f"Executing {strategy.value} search for: {query[:100]}...")
         
+        # Backends swallow query errors and return no rows, so note their failure counts
+        # to tell a genuinely empty answer from one produced by a failing store
+        failures_before = self._backend_failures()
+        
         try:
+            # Embed the query once; every strategy and store reuses this vector
+            query_vector = await self._embed_query(query)
+            
             if strategy == SearchStrategy.SEMANTIC_FIRST:
-                result = await self._semantic_first_search(query, context_domains, filters, **kwargs)
+                result = await self._semantic_first_search(query, context_domains, filters, query_vector, **kwargs)
             elif strategy == SearchStrategy.GRAPH_FIRST:
-                result = await self._graph_first_search(query, context_domains, filters, **kwargs)
+                result = await self._graph_first_search(query, context_domains, filters, query_vector, **kwargs)
             elif strategy == SearchStrategy.MULTI_STEP:
-                result = await self._multi_step_search(query, context_domains, filters, **kwargs)
+                result = await self._multi_step_search(query, context_domains, filters, query_vector, **kwargs)
             else:  # BALANCED
-                result = await self._balanced_search(query, context_domains, filters, **kwargs)
+                result = await self._balanced_search(query, context_domains, filters, query_vector, **kwargs)
             
             # Calculate execution time and confidence
             execution_time = time.time() - start_time
@@ -128,9 +248,16 @@ class HybridSearchOrchestrator:
                 confidence_score=confidence_score
             )
             
-            # Cache result
-            if self.config.enable_caching:
-                await self.cache.set(cache_key, search_result)
+            # Cache result, longer for popular queries; partial results from a soft timeout or
+            # a failing backend are returned but never cached, so the next request retries it
+            complete = (
+                not search_result.metadata.get('timed_out')
+                and self._backend_failures() == failures_before
+            )
+            if self.config.enable_caching and complete:
+                await self.cache.set_bytes(cache_key, dumps(search_result.to_dict()), self._adaptive_ttl(cache_key))
+                if not search_result.results:
+                    self._empty_queries.add(cache_key)
                 
             logger.info(f"Search completed: {len(search_result.results)} results in {execution_time:.2f}s")
             return search_result
@@ -152,20 +279,26 @@ class HybridSearchOrchestrator:
         query: str, 
         context_domains: Optional[List[str]], 
         filters: Optional[Dict],
+        query_vector: Optional[List[float]] = None,
         **kwargs
     ) -> Dict:
         """Weaviate semantic search → Neo4j graph expansion"""
         
+        # Weaviate-side filters have no Cypher equivalent, so filtered queries keep two round trips
+        if self.config.use_neo4j_vector and not filters:
+            return await self._fused_semantic_first_search(query, query_vector, **kwargs)
+        
         # Step 1: Semantic search in Weaviate
         weaviate_results = await self.weaviate.semantic_search(
             query=query,
             limit=kwargs.get('semantic_limit', 20),
             threshold=self.config.similarity_threshold,
-            filters=filters
+            filters=filters,
+            vector=query_vector
         )
         
-        # Step 2: Extract entity IDs for Neo4j expansion
-        entity_ids = [r.get('entity_id') for r in weaviate_results if r.get('entity_id')]
+        # Step 2: Extract distinct entity IDs for one batched Neo4j expansion
+        entity_ids = list(dict.fromkeys(r.get('entity_id') for r in weaviate_results if r.get('entity_id')))
         
         # Step 3: Graph traversal from semantic results
         graph_results = []
@@ -189,11 +322,43 @@ class HybridSearchOrchestrator:
             'metadata': {'strategy_details': 'semantic_first', 'fusion_method': self.config.fusion_strategy}
         }
     
+    async def _fused_semantic_first_search(
+        self,
+        query: str,
+        query_vector: Optional[List[float]] = None,
+        **kwargs
+    ) -> Dict:
+        """Semantic-first search as a single Neo4j vector + traversal query"""
+        
+        if query_vector is None:
+            query_vector = await self._embed_query(query)
+        
+        semantic_results, graph_results = await self.neo4j.semantic_then_expand(
+            query_vector=query_vector,
+            limit=kwargs.get('semantic_limit', 20),
+            max_hops=kwargs.get('max_hops', self.config.max_hops),
+            score_threshold=self.config.similarity_threshold,
+            relationship_types=kwargs.get('relationship_types', None)
+        )
+        
+        fused_results = self._fuse_results(
+            semantic_results,
+            graph_results,
+            weights={'semantic': 0.7, 'graph': 0.3}
+        )
+        
+        return {
+            'results': fused_results,
+            'sources': {'neo4j_vector': len(semantic_results), 'neo4j': len(graph_results)},
+            'metadata': {'strategy_details': 'semantic_first_fused', 'fusion_method': self.config.fusion_strategy}
+        }
+    
     async def _graph_first_search(
         self, 
         query: str, 
         context_domains: Optional[List[str]], 
         filters: Optional[Dict],
+        query_vector: Optional[List[float]] = None,
         **kwargs
     ) -> Dict:
         """Neo4j graph search → Weaviate semantic refinement"""
@@ -206,7 +371,8 @@ class HybridSearchOrchestrator:
             entities=query_entities,
             query_intent=query,
             max_hops=kwargs.get('max_hops', self.config.max_hops),
-            limit=kwargs.get('graph_limit', 30)
+            limit=kwargs.get('graph_limit', 30),
+            intent_vector=query_vector
         )
         
         # Step 3: Semantic refinement of graph results
@@ -216,7 +382,8 @@ class HybridSearchOrchestrator:
             weaviate_results = await self.weaviate.refine_results(
                 query=query,
                 candidates=content_fragments,
-                threshold=self.config.similarity_threshold
+                threshold=self.config.similarity_threshold,
+                query_vector=query_vector
             )
         
         # Step 4: Fuse results
@@ -237,25 +404,51 @@ class HybridSearchOrchestrator:
         query: str, 
         context_domains: Optional[List[str]], 
         filters: Optional[Dict],
+        query_vector: Optional[List[float]] = None,
         **kwargs
     ) -> Dict:
         """Parallel execution of both approaches → intelligent fusion"""
         
         # Execute both searches in parallel
-        semantic_task = self.weaviate.semantic_search(
+        semantic_search = self.weaviate.semantic_search(
             query=query,
             limit=kwargs.get('limit', 25),
             threshold=self.config.similarity_threshold,
-            filters=filters
+            filters=filters,
+            vector=query_vector
         )
         
-        graph_task = self.neo4j.hybrid_search(
+        graph_search = self.neo4j.hybrid_search(
             query=query,
             context_domains=context_domains,
-            limit=kwargs.get('limit', 25)
+            limit=kwargs.get('limit', 25),
+            query_vector=query_vector
+        )
+        
+        tasks = {
+            'weaviate': asyncio.create_task(semantic_search),
+            'neo4j': asyncio.create_task(graph_search)
+        }
+        timeout = self.config.soft_timeout_ms / 1000 if self.config.soft_timeout_ms is not None else None
+        pending = set(tasks.values())
+        try:
+            # Stop early on the first failure or once the soft timeout expires
+            _, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            # Never leave a backend call running after this search has moved on
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        
+        # A failed backend propagates its exception, as gather did
+        weaviate_results, neo4j_results = (
+            [] if task in pending else task.result() for task in tasks.values()
         )
         
-        weaviate_results, neo4j_results = await asyncio.gather(semantic_task, graph_task)
+        timed_out = [name for name, task in tasks.items() if task in pending]
+        if timed_out:
+            logger.warning(f"Balanced search fusing without {', '.join(timed_out)} after soft timeout")
         
         # Intelligent fusion based on query characteristics
         fusion_weights = self._determine_fusion_weights(query, weaviate_results, neo4j_results)
@@ -272,7 +465,8 @@ class HybridSearchOrchestrator:
             'metadata': {
                 'strategy_details': 'balanced_parallel',
                 'fusion_weights': fusion_weights,
-                'total_candidates': len(weaviate_results) + len(neo4j_results)
+                'total_candidates': len(weaviate_results) + len(neo4j_results),
+                'timed_out': timed_out
             }
         }
     
@@ -281,41 +475,61 @@ class HybridSearchOrchestrator:
         query: str, 
         context_domains: Optional[List[str]], 
         filters: Optional[Dict],
+        query_vector: Optional[List[float]] = None,
         **kwargs
     ) -> Dict:
         """Multi-step retrieval with iterative refinement"""
         
         steps_results = []
         current_query = query
+        max_steps = kwargs.get('max_steps', 3)
         
-        for step in range(kwargs.get('max_steps', 3)):
-            logger.info(f"Multi-step search - Step {step + 1}")
-            
-            # Step 1: Initial broad retrieval
-            broad_results = await self.weaviate.semantic_search(
-                query=current_query,
-                limit=50,
-                threshold=0.6  # Lower threshold for broader recall
-            )
-            
-            # Step 2: Graph-based context expansion
-            if broad_results:
-                entity_ids = [r.get('entity_id') for r in broad_results[:10]]
-                context_results = await self.neo4j.get_context_for_entities(entity_ids)
+        # Only retrievals with the original query can reuse its precomputed vector
+        def retrieve(step_query: str):
+            return self._broad_retrieval(step_query, query_vector if step_query == query else None)
+        
+        broad_task = asyncio.create_task(retrieve(current_query))
+        try:
+            for step in range(max_steps):
+                logger.info(f"Multi-step search - Step {step + 1}")
                 
-                # Step 3: Refine query based on found context
-                if step < kwargs.get('max_steps', 3) - 1:
-                    current_query = await self._refine_query_with_context(
-                        original_query=query,
-                        context=context_results
-                    )
-            
-            steps_results.append({
-                'step': step + 1,
-                'query': current_query,
-                'results': broad_results,
-                'context_expansion': len(context_results) if 'context_results' in locals() else 0
-            })
+                # Step 1: Initial broad retrieval (started before this iteration)
+                broad_results = await broad_task
+                
+                # Speculatively prefetch the next step's retrieval with the current query,
+                # overlapping it with context expansion and refinement
+                is_last_step = step == max_steps - 1
+                speculative_query = current_query
+                if not is_last_step:
+                    broad_task = asyncio.create_task(retrieve(speculative_query))
+                
+                # Step 2: Graph-based context expansion
+                context_results = []
+                if broad_results:
+                    entity_ids = list(dict.fromkeys(r.get('entity_id') for r in broad_results[:10] if r.get('entity_id')))
+                    if entity_ids:
+                        context_results = await self.neo4j.get_context_for_entities(entity_ids)
+                    
+                    # Step 3: Refine query based on found context
+                    if not is_last_step:
+                        current_query = await self._refine_query_with_context(
+                            original_query=query,
+                            context=context_results
+                        )
+                        
+                        # The prefetch only pays off if refinement kept the query unchanged
+                        if current_query != speculative_query:
+                            broad_task.cancel()
+                            broad_task = asyncio.create_task(retrieve(current_query))
+                
+                steps_results.append({
+                    'step': step + 1,
+                    'query': current_query,
+                    'results': broad_results,
+                    'context_expansion': len(context_results)
+                })
+        finally:
+            broad_task.cancel()
         
         # Final fusion of all step results
         all_results = []
@@ -335,6 +549,32 @@ class HybridSearchOrchestrator:
             }
         }
     
+    async def _broad_retrieval(self, query: str, query_vector: Optional[List[float]] = None) -> List[Dict]:
+        """High-recall semantic retrieval used by each multi-step iteration"""
+        return await self.weaviate.semantic_search(
+            query=query,
+            limit=50,
+            threshold=0.6,  # Lower threshold for broader recall
+            vector=query_vector
+        )
+    
+    async def _embed_query(self, query: str) -> List[float]:
+        """Embed a query, sharing the vector across requests through the cache"""
+        
+        embedding_service = self.weaviate.embedding_service
+        if not self.config.enable_caching:
+            return (await embedding_service.embed_text(query)).tolist()
+        
+        key_source = f"{embedding_service.model_name}\x1f{query}".encode()
+        cache_key = "embedding:" + hashlib.blake2b(key_source, digest_size=16).hexdigest()
+        cached = await self.cache.get_bytes(cache_key)
+        if cached:
+            return np.frombuffer(cached, dtype=np.float32).tolist()
+        
+        query_vector = await embedding_service.embed_text(query)
+        await self.cache.set_bytes(cache_key, query_vector.tobytes())
+        return query_vector.tolist()
+    
     def _fuse_results(
         self, 
         weaviate_results: List[Dict], 
@@ -342,13 +582,7 @@ class HybridSearchOrchestrator:
         weights: Dict[str, float]
     ) -> List[Dict]:
         """Fuse results from multiple sources using specified strategy"""
-        
-        if self.config.fusion_strategy == "reciprocal_rank":
-            return self._reciprocal_rank_fusion(weaviate_results, neo4j_results, weights)
-        elif self.config.fusion_strategy == "weighted":
-            return self._weighted_fusion(weaviate_results, neo4j_results, weights)
-        else:  # linear
-            return self._linear_fusion(weaviate_results, neo4j_results, weights)
+        return self._fuse(weaviate_results, neo4j_results, weights)
     
     def _reciprocal_rank_fusion(
         self, 
@@ -358,28 +592,46 @@ class HybridSearchOrchestrator:
     ) -> List[Dict]:
         """Reciprocal Rank Fusion (RRF) for combining ranked lists"""
         
-        k = 60  # RRF constant
-        fused_scores = {}
-        
-        # Process Weaviate results
-        for i, result in enumerate(weaviate_results):
-            doc_id = result.get('id', f"weaviate_{i}")
-            score = weights.get('semantic', 0.5) / (k + i + 1)
-            fused_scores[doc_id] = fused_scores.get(doc_id, 0) + score
-            result['fusion_score'] = fused_scores[doc_id]
-            result['source'] = 'weaviate'
-        
-        # Process Neo4j results  
-        for i, result in enumerate(neo4j_results):
-            doc_id = result.get('id', f"neo4j_{i}")
-            score = weights.get('graph', 0.5) / (k + i + 1)
-            fused_scores[doc_id] = fused_scores.get(doc_id, 0) + score
-            result['fusion_score'] = fused_scores[doc_id]
-            result['source'] = 'neo4j'
-        
-        # Combine and sort by fusion score
         all_results = weaviate_results + neo4j_results
-        return sorted(all_results, key=lambda x: x.get('fusion_score', 0), reverse=True)[:self.config.max_results]
+        if not all_results:
+            return []
+        
+        ids = [str(r.get('id', f"weaviate_{i}")) for i, r in enumerate(weaviate_results)]
+        ids += [str(r.get('id', f"neo4j_{i}")) for i, r in enumerate(neo4j_results)]
+        
+        # 1-based rank within each list, weighted by the list's source
+        ranks = np.concatenate((
+            np.arange(1, len(weaviate_results) + 1),
+            np.arange(1, len(neo4j_results) + 1)
+        ))
+        source_weights = np.repeat(
+            [weights.get('semantic', 0.5), weights.get('graph', 0.5)],
+            [len(weaviate_results), len(neo4j_results)]
+        )
+        
+        # Sum contributions per document; each document is kept once, at its first occurrence
+        _, first, inverse = np.unique(ids, return_index=True, return_inverse=True)
+        fused_scores = _rrf_scores(inverse.ravel(), source_weights / (RRF_K + ranks), len(first))
+        
+        # Top-k by partition, then order only that slice (ties keep list order)
+        max_results = self.config.max_results
+        top = len(fused_scores)
+        if max_results < top:
+            top = max_results
+            candidates = np.argpartition(-fused_scores, top - 1)[:top]
+        else:
+            candidates = np.arange(top)
+        order = candidates[np.lexsort((first[candidates], -fused_scores[candidates]))]
+        
+        # Only the surviving top-k dicts are annotated
+        fused = []
+        for doc in order:
+            position = first[doc]
+            result = all_results[position]
+            result['fusion_score'] = float(fused_scores[doc])
+            result['source'] = 'weaviate' if position < len(weaviate_results) else 'neo4j'
+            fused.append(result)
+        return fused
     
     def _weighted_fusion(self, weaviate_results: List[Dict], neo4j_results: List[Dict], weights: Dict[str, float]) -> List[Dict]:
         """Simple weighted combination of results"""
@@ -394,17 +646,14 @@ class HybridSearchOrchestrator:
     def _determine_fusion_weights(self, query: str, weaviate_results: List[Dict], neo4j_results: List[Dict]) -> Dict[str, float]:
         """Dynamically determine optimal fusion weights based on query characteristics"""
         
-        # Analyze query for graph vs semantic indicators
-        graph_keywords = ['relationship', 'connected', 'related', 'impact', 'cause', 'effect', 'network']
-        semantic_keywords = ['similar', 'like', 'meaning', 'concept', 'understanding']
-        
+        # Analyze query for graph vs semantic indicators (distinct keywords present)
         query_lower = query.lower()
-        graph_signals = sum(1 for kw in graph_keywords if kw in query_lower)
-        semantic_signals = sum(1 for kw in semantic_keywords if kw in query_lower)
+        graph_signals = len(set(GRAPH_KEYWORD_PATTERN.findall(query_lower)))
+        semantic_signals = len(set(SEMANTIC_KEYWORD_PATTERN.findall(query_lower)))
         
         # Analyze result quality
-        weaviate_avg_score = sum(r.get('score', 0) for r in weaviate_results) / max(len(weaviate_results), 1)
-        neo4j_avg_score = sum(r.get('score', 0) for r in neo4j_results) / max(len(neo4j_results), 1)
+        weaviate_avg_score = _mean_score(weaviate_results)
+        neo4j_avg_score = _mean_score(neo4j_results)
         
         # Calculate adaptive weights
         if graph_signals > semantic_signals and neo4j_avg_score > weaviate_avg_score:
@@ -423,7 +672,7 @@ class HybridSearchOrchestrator:
         
         # Base confidence on result count and average scores
         result_count_factor = min(len(results) / 10, 1.0)  # Normalized to 10 results
-        avg_score = sum(r.get('score', 0) for r in results) / len(results)
+        avg_score = _mean_score(results)
         
         # Strategy-specific adjustments
         strategy_multiplier = {
@@ -435,19 +684,41 @@ class HybridSearchOrchestrator:
         
         return min(result_count_factor * avg_score * strategy_multiplier, 1.0)
     
+    def _track_query_frequency(self, cache_key: str):
+        """Count a request for cache_key, starting over once too many keys are tracked"""
+        if len(self._query_frequency) >= QUERY_FREQUENCY_MAX_KEYS and cache_key not in self._query_frequency:
+            self._query_frequency.clear()
+        self._query_frequency[cache_key] += 1
+    
+    def _adaptive_ttl(self, cache_key: str) -> int:
+        """Result TTL growing with the log of how often the query has been requested"""
+        frequency = max(self._query_frequency[cache_key], 1)
+        return int(ADAPTIVE_TTL_BASE * min(ADAPTIVE_TTL_MAX_FACTOR, 1 + math.log2(frequency)))
+    
+    def _backend_failures(self) -> int:
+        """Total read queries the backends have failed and answered with no rows"""
+        return self.neo4j.failed_queries + self.weaviate.failed_queries
+    
+    def _is_known_empty(self, cache_key: str) -> bool:
+        """Check the negative cache, rebuilding it when stale or full"""
+        if (time.monotonic() - self._empty_queries_since > EMPTY_QUERY_CACHE_MAX_AGE
+                or len(self._empty_queries) >= EMPTY_QUERY_CACHE_CAPACITY):
+            self._empty_queries.clear()
+            self._empty_queries_since = time.monotonic()
+        return cache_key in self._empty_queries
+    
     def _generate_cache_key(self, query: str, strategy: SearchStrategy, context_domains: Optional[List[str]], filters: Optional[Dict]) -> str:
         """Generate cache key for query results"""
-        import hashlib
         
         key_components = [
-            query,
-            strategy.value,
-            str(sorted(context_domains)) if context_domains else "",
-            str(sorted(filters.items())) if filters else ""
+            query.encode(),
+            strategy.value.encode(),
+            canonical_dumps(sorted(context_domains)) if context_domains else b"",
+            canonical_dumps(filters) if filters else b""
         ]
         
-        key_string = "|".join(key_components)
-        return hashlib.md5(key_string.encode()).hexdigest()
+        # Non-cryptographic use: blake2b is faster than md5 and needs no extra dependency
+        return SEARCH_KEY_PREFIX + hashlib.blake2b(b"\x1f".join(key_components), digest_size=16).hexdigest()
     
     async def _refine_query_with_context(self, original_query: str, context: List[Dict]) -> str:
         """Refine query based on retrieved context for multi-step search"""
@@ -456,15 +727,11 @@ class HybridSearchOrchestrator:
     
     def _deduplicate_and_rank(self, results: List[Dict], query: str) -> List[Dict]:
         """Remove duplicates and rank final results"""
-        seen_ids = set()
-        unique_results = []
-        
+        # First occurrence of each ID wins
+        unique_results = {}
         for result in results:
-            doc_id = result.get('id', result.get('entity_id', ''))
-            if doc_id not in seen_ids:
-                seen_ids.add(doc_id)
-                unique_results.append(result)
+            unique_results.setdefault(result.get('id', result.get('entity_id', '')), result)
         
         # Re-rank based on relevance to original query
         # Placeholder for more sophisticated ranking
-        return sorted(unique_results, key=lambda x: x.get('score', 0), reverse=True)[:self.config.max_results]
\ No newline at end of file
+        return heapq.nlargest(self.config.max_results, unique_results.values(), key=lambda x: x.get('score', 0))
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Compiled numeric kernels for the embedding utilities, with NumPy fallbacks
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import get_num_threads, njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def cosine(u, v):
+        """Cosine similarity with dot product and both norms fused into one loop"""
+        # The loop runs without bounds checks, so mismatched lengths must be rejected up front
+        if u.shape[0] != v.shape[0]:
+            raise ValueError("cosine: vectors must have the same length")
+        s = 0.0
+        nu = 0.0
+        nv = 0.0
+        for i in range(u.shape[0]):
+            a = u[i]
+            b = v[i]
+            s += a * b
+            nu += a * a
+            nv += b * b
+        return s / (math.sqrt(nu) * math.sqrt(nv) + 1e-12)
+    
+    # Eager signature so compilation happens at import, not on the first query
+    @njit("void(float32[:, ::1], float32[::1], float32[::1])", parallel=True, cache=True, fastmath=True)
+    def batch_cosine(C, q, out):
+        """Score L2-normalized rows of C against normalized q, rows split across threads"""
+        if C.shape[1] != q.shape[0] or C.shape[0] != out.shape[0]:
+            raise ValueError("batch_cosine: shapes of C, q and out do not match")
+        for i in prange(C.shape[0]):
+            s = 0.0
+            for j in range(C.shape[1]):
+                s += C[i, j] * q[j]
+            out[i] = s
+    
+    @njit(parallel=True, cache=True)
+    def topk_candidates(sims, k):
+        """Indices holding the k largest sims: one bounded min-heap per thread, merged by the caller"""
+        n = sims.shape[0]
+        n_chunks = get_num_threads()
+        size = (n + n_chunks - 1) // n_chunks
+        heap_vals = np.full((n_chunks, k), -np.inf, dtype=sims.dtype)
+        heap_idx = np.full((n_chunks, k), -1, dtype=np.int64)
+        for c in prange(n_chunks):
+            vals = heap_vals[c]
+            idx = heap_idx[c]
+            for i in range(c * size, min(n, (c + 1) * size)):
+                x = sims[i]
+                if x <= vals[0]:
+                    continue
+                # Replace the smallest kept value and sift it down
+                pos = 0
+                while True:
+                    child = 2 * pos + 1
+                    if child >= k:
+                        break
+                    if child + 1 < k and vals[child + 1] < vals[child]:
+                        child += 1
+                    if vals[child] >= x:
+                        break
+                    vals[pos] = vals[child]
+                    idx[pos] = idx[child]
+                    pos = child
+                vals[pos] = x
+                idx[pos] = i
+        flat = heap_idx.ravel()
+        return flat[flat >= 0]
+else:
+    def cosine(u, v):
+        """Cosine similarity of two 1-D arrays"""
+        return float(np.dot(u, v) / (np.linalg.norm(u) * np.linalg.norm(v) + 1e-12))
+    
+    def batch_cosine(C, q, out):
+        """Score L2-normalized rows of C against normalized q into out"""
+        np.dot(C, q, out=out)
+    
+    def topk_candidates(sims, k):
+        """Indices of the k largest sims, unordered"""
+        return np.argpartition(-sims, k - 1)[:k]
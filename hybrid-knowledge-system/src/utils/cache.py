@@ -3,15 +3,66 @@ Cache Manager for hybrid search results
 """
 
 import asyncio
+import dataclasses
 import json
 import time
-from typing import Any, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 import redis.asyncio as redis
 
+# C-accelerated serialization when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# In-process L1 tier in front of Redis: entry count and maximum entry age (seconds)
+L1_CACHE_SIZE = 512
+L1_CACHE_TTL = 120
+
+# Upper bound on pooled Redis connections shared by all cache calls
+REDIS_MAX_CONNECTIONS = 64
+
+# Window during which concurrent Redis GETs are coalesced into one MGET (seconds)
+GET_COALESCE_SECONDS = 0.002
+
+# Namespace of cached search results, the keys invalidate() clears by default
+SEARCH_KEY_PREFIX = "search:"
+
+# Keys unlinked per Redis round trip while invalidating
+INVALIDATE_BATCH_SIZE = 500
+
+def _json_default(value: Any) -> Any:
+    """Fallback encoder for values stdlib json cannot serialize"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+def dumps(value: Any) -> bytes:
+    """Serialize a cache value to bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, default=_json_default).encode()
+
+def canonical_dumps(value: Any) -> bytes:
+    """Serialize with sorted keys, so equal values always give equal bytes (for cache keys)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=_json_default, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(value, default=_json_default, sort_keys=True, separators=(',', ':')).encode()
+
+def loads(value: bytes) -> Any:
+    """Deserialize a cached value"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(value)
+    return json.loads(value)
+
 class CacheManager:
     """Async Redis-based cache manager for search results"""
     
@@ -23,46 +74,120 @@ class CacheManager:
         self.redis_url = redis_url
         self.default_ttl = default_ttl
         self.client: Optional[redis.Redis] = None
+        # Created lazily so it binds to the running event loop (Python 3.9)
+        self._connect_lock: Optional[asyncio.Lock] = None
+        
+        # key -> (expires_at, serialized value); hits are decoded afresh so callers never share objects
+        self._l1: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        
+        # Keys awaiting the next coalesced MGET, and the task that will issue it
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    def _l1_get(self, key: str) -> Optional[bytes]:
+        """Return the L1 entry for key if present and not expired"""
+        entry = self._l1.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._l1[key]
+            return None
+        self._l1.move_to_end(key)
+        return entry[1]
+    
+    def _l1_set(self, key: str, value: bytes, ttl: int):
+        """Store an entry in L1, evicting the least recently used beyond L1_CACHE_SIZE"""
+        self._l1[key] = (time.monotonic() + min(ttl, L1_CACHE_TTL), value)
+        self._l1.move_to_end(key)
+        if len(self._l1) > L1_CACHE_SIZE:
+            self._l1.popitem(last=False)
     
     async def connect(self):
         """Initialize Redis connection"""
         try:
-            self.client = redis.from_url(self.redis_url)
-            await self.client.ping()
+            pool = redis.ConnectionPool.from_url(self.redis_url, max_connections=REDIS_MAX_CONNECTIONS)
+            client = redis.Redis(connection_pool=pool)
+            await client.ping()
+            # Publish the client only once it is known to work
+            self.client = client
             logger.info("Connected to Redis cache")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             self.client = None
     
+    async def _ensure_connected(self) -> bool:
+        """Connect once, even when several coroutines race on first use; report availability"""
+        if self.client:
+            return True
+        
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        
+        async with self._connect_lock:
+            if not self.client:
+                await self.connect()
+        
+        return self.client is not None
+    
     async def get(self, key: str) -> Optional[Any]:
         """Get cached value"""
-        if not self.client:
-            await self.connect()
+        value = await self.get_bytes(key)
+        return loads(value) if value else None
+    
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """Get a cached value in its serialized form, for callers that decode it themselves"""
+        local = self._l1_get(key)
+        if local is not None:
+            return local
         
-        if not self.client:
+        if not await self._ensure_connected():
             return None
         
-        try:
-            value = await self.client.get(key)
-            if value:
-                return json.loads(value)
-            return None
-        except Exception as e:
-            logger.error(f"Cache get failed: {e}")
-            return None
+        # Concurrent lookups of the same key share one future
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_pending())
+        
+        value = await asyncio.shield(future)
+        if value:
+            self._l1_set(key, value, self.default_ttl)
+            return value
+        return None
+    
+    async def _flush_pending(self):
+        """Resolve all keys requested within the coalescing window with a single MGET"""
+        # Keys requested while an MGET is in flight see this task still running, so keep
+        # flushing until nothing is pending rather than leaving them without a flush
+        while self._pending:
+            await asyncio.sleep(GET_COALESCE_SECONDS)
+            batch, self._pending = self._pending, {}
+            
+            try:
+                values = await self.client.mget(list(batch))
+            except Exception as e:
+                logger.error(f"Cache get failed: {e}")
+                values = [None] * len(batch)
+            
+            for future, value in zip(batch.values(), values):
+                if not future.done():
+                    future.set_result(value)
     
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set cached value"""
-        if not self.client:
-            await self.connect()
-        
-        if not self.client:
+        return await self.set_bytes(key, dumps(value), ttl)
+    
+    async def set_bytes(self, key: str, serialized: bytes, ttl: Optional[int] = None) -> bool:
+        """Set a value that the caller has already serialized"""
+        if not await self._ensure_connected():
             return False
         
         try:
             ttl = ttl or self.default_ttl
-            serialized = json.dumps(value, default=str)
             await self.client.setex(key, ttl, serialized)
+            self._l1_set(key, serialized, ttl)
             return True
         except Exception as e:
             logger.error(f"Cache set failed: {e}")
@@ -70,6 +195,8 @@ class CacheManager:
     
     async def delete(self, key: str) -> bool:
         """Delete cached value"""
+        self._l1.pop(key, None)
+        
         if not self.client:
             return False
         
@@ -80,6 +207,28 @@ class CacheManager:
             logger.error(f"Cache delete failed: {e}")
             return False
     
+    async def invalidate(self, prefix: str = SEARCH_KEY_PREFIX) -> bool:
+        """Clear keys under prefix from both tiers, leaving the rest of the Redis database alone"""
+        for key in [key for key in self._l1 if key.startswith(prefix)]:
+            del self._l1[key]
+        
+        if not self.client:
+            return False
+        
+        try:
+            batch = []
+            async for key in self.client.scan_iter(match=prefix + '*', count=INVALIDATE_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= INVALIDATE_BATCH_SIZE:
+                    await self.client.unlink(*batch)
+                    batch = []
+            if batch:
+                await self.client.unlink(*batch)
+            return True
+        except Exception as e:
+            logger.error(f"Cache invalidate failed: {e}")
+            return False
+    
     async def close(self):
         """Close Redis connection"""
         if self.client:
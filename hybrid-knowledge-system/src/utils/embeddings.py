@@ -4,34 +4,164 @@ Embedding Service: Handles text embedding generation for semantic search
 
 import os
 import asyncio
+import base64
+import hashlib
+import logging
+import threading
 import warnings
-from typing import List, Optional, Union
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
-from functools import lru_cache
 
 # Suppress specific FutureWarnings from huggingface_hub
 warnings.filterwarnings("ignore", category=FutureWarning, module="huggingface_hub")
 
 try:
+    import torch
     from sentence_transformers import SentenceTransformer
+    from transformers import AutoTokenizer
     SENTENCE_TRANSFORMERS_AVAILABLE = True
 except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
 
+try:
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
 try:
     import openai
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
+from src.utils._kernels import batch_cosine, cosine, topk_candidates
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Providers that run a local model exposing encode(); the rest call a remote API
+LOCAL_PROVIDERS = ("sentence_transformers", "onnx")
+
+# Candidate counts from which top-k selection is split across threads
+TOPK_PARALLEL_MIN_CANDIDATES = 1_000_000
+
+# Batches at least this large are sharded across GPUs when more than one is present
+MULTI_PROCESS_MIN_TEXTS = 1024
+
+# OpenAI embedding requests allowed in flight at once per embed_texts call
+OPENAI_MAX_CONCURRENT_BATCHES = 8
+
+# CPU threads for local inference; unset means one per core
+EMBED_NUM_THREADS = int(os.getenv("EMBED_NUM_THREADS") or os.cpu_count() or 1)
+
+# Opt-in torch.compile of the transformer (slow first load, faster encodes afterwards)
+EMBED_TORCH_COMPILE = os.getenv("EMBED_TORCH_COMPILE", "false").lower() == "true"
+
+# Loaded sentence-transformers models shared by every service, keyed on (model name, device);
+# weak values so a model is released once no service uses it
+_MODEL_CACHE: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+_MODEL_CACHE_LOCK = threading.Lock()
+
+# Multi-GPU encoder pools beside the shared models, keyed the same way: key -> [pool, users].
+# One pool per model, however many services hold it; stopped when the last user closes.
+_POOL_CACHE: Dict[Tuple[str, str], list] = {}
+
+# Where exported (and quantized) ONNX models are kept between runs
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", ".onnx_cache")
+
+def quantize(embeddings: np.ndarray, normalize: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize rows to int8 with a per-row float32 scale (row ~= q * scale), optionally L2-normalizing first"""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    matrix = matrix.reshape(-1, matrix.shape[-1])
+    if normalize:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1.0, norms)
+    scale = np.max(np.abs(matrix), axis=1) / 127
+    scale[scale == 0] = 1.0  # zero rows quantize to zero
+    q = np.rint(matrix / scale[:, None]).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+def _acquire_pool(key: Tuple[str, str], model: "SentenceTransformer"):
+    """Return the shared encoder pool for key, starting it for its first user"""
+    with _MODEL_CACHE_LOCK:
+        entry = _POOL_CACHE.get(key)
+        if entry is None:
+            logger.info(f"Starting encoder pool for {key[0]} on every GPU")
+            entry = _POOL_CACHE[key] = [model.start_multi_process_pool(), 0]
+        entry[1] += 1
+        return entry[0]
+
+def _release_pool(key: Tuple[str, str]):
+    """Drop one user of the pool for key; return the pool once nobody uses it, for stopping"""
+    with _MODEL_CACHE_LOCK:
+        entry = _POOL_CACHE[key]
+        entry[1] -= 1
+        if entry[1] > 0:
+            return None
+        del _POOL_CACHE[key]
+        return entry[0]
+
+def _decode_base64_embedding(encoded: str) -> np.ndarray:
+    """Decode an OpenAI base64 embedding (raw little-endian float32) without parsing floats"""
+    return np.frombuffer(base64.b64decode(encoded), dtype=np.float32)
+
+class _OnnxEncoder:
+    """ONNX Runtime sentence encoder: tokenize, run the session, mean-pool and L2-normalize"""
+    
+    def __init__(self, model_name: str, int8: bool = False):
+        export_dir = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "--"))
+        model_file = "model_quantized.onnx" if int8 else "model.onnx"
+        model_path = os.path.join(export_dir, model_file)
+        
+        # Export once; later runs load the saved graph directly
+        if not os.path.exists(model_path):
+            ort_model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+            ort_model.save_pretrained(export_dir)
+            if int8:
+                quantizer = ORTQuantizer.from_pretrained(ort_model)
+                qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+                quantizer.quantize(save_dir=export_dir, quantization_config=qconfig)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.tokenizer.save_pretrained(export_dir)
+        
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = EMBED_NUM_THREADS
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+    
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Encode texts into an (N, D) float32 matrix, sentence-transformers style"""
+        batches = []
+        for i in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[i:i + batch_size], padding=True, truncation=True, return_tensors="np"
+            )
+            inputs = {name: value for name, value in tokens.items() if name in self.input_names}
+            hidden = self.session.run(None, inputs)[0]
+            
+            # Mean pool over real tokens, then normalize like the sentence-transformers pipeline
+            mask = tokens["attention_mask"][..., np.newaxis].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            batches.append(pooled.astype(np.float32))
+        return np.concatenate(batches)
+
 class EmbeddingService:
     """
     Service for generating text embeddings using various providers.
-    Supports both local sentence-transformers and OpenAI embeddings.
+    Supports local sentence-transformers (PyTorch or ONNX Runtime) and OpenAI embeddings.
     """
     
     def __init__(
@@ -39,13 +169,17 @@ class EmbeddingService:
         provider: str = "sentence_transformers",
         model_name: Optional[str] = None,
         openai_api_key: Optional[str] = None,
-        cache_size: int = 1000
+        cache_size: int = 1000,
+        quantized: bool = False,
+        onnx_int8: bool = False
     ):
         self.provider = provider.lower()
+        self.quantized = quantized
+        self.onnx_int8 = onnx_int8
         self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         
         # Model configuration
-        if self.provider == "sentence_transformers":
+        if self.provider in LOCAL_PROVIDERS:
             self.model_name = model_name or os.getenv("HF_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
             self.model = None
             self.dimensions = 384  # Default for all-MiniLM-L6-v2
@@ -58,6 +192,20 @@ class EmbeddingService:
             raise ValueError(f"Unsupported embedding provider: {provider}")
         
         self.cache_size = cache_size
+        # LRU of text digest -> read-only float32 embedding; locked so any thread may use it
+        self._cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # One encoder process per GPU, started only on multi-GPU hosts and shared per model
+        self._pool = None
+        self._pool_key: Optional[Tuple[str, str]] = None
+        # Async OpenAI client for batched requests, created with the model
+        self._aclient = None
+        # Local models run on one dedicated thread so the device context stays put;
+        # remote providers use the loop's default executor
+        self._executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+            if self.provider in LOCAL_PROVIDERS else None
+        )
         
         # Initialize the model
         self._initialize_model()
@@ -69,8 +217,30 @@ class EmbeddingService:
                 if not SENTENCE_TRANSFORMERS_AVAILABLE:
                     raise ImportError("sentence-transformers not installed")
                 
-                logger.info(f"Loading sentence-transformers model: {self.model_name}")
-                self.model = SentenceTransformer(self.model_name)
+                self._configure_threads()
+                
+                # Prefer a GPU when present, in fp16 to use tensor cores and halve memory traffic
+                device = "cuda" if torch.cuda.is_available() else "cpu"
+                self.model = self._load_sentence_transformer(device)
+                
+                if device == "cuda" and torch.cuda.device_count() > 1:
+                    self._pool_key = (self.model_name, device)
+                    self._pool = _acquire_pool(self._pool_key, self.model)
+                
+                # Get actual dimensions (from the model config, so a shared model needs no test encode)
+                self.dimensions = (
+                    self.model.get_sentence_embedding_dimension()
+                    or len(self.model.encode(["test"])[0])
+                )
+                
+                logger.info(f"Model loaded successfully. Dimensions: {self.dimensions}")
+                
+            elif self.provider == "onnx":
+                if not ONNX_AVAILABLE:
+                    raise ImportError("optimum[onnxruntime] not installed")
+                
+                logger.info(f"Loading ONNX Runtime model: {self.model_name} (int8={self.onnx_int8})")
+                self.model = _OnnxEncoder(self.model_name, int8=self.onnx_int8)
                 
                 # Get actual dimensions
                 test_embedding = self.model.encode(["test"])
@@ -84,137 +254,257 @@ class EmbeddingService:
                 if not self.openai_api_key:
                     raise ValueError("OpenAI API key required for OpenAI embeddings")
                 
+                # The client retries 429s and transient errors with backoff itself
+                self._aclient = openai.AsyncOpenAI(api_key=self.openai_api_key)
                 logger.info(f"Using OpenAI embeddings model: {self.model_name}")
                 
         except Exception as e:
             logger.error(f"Failed to initialize embedding model: {e}")
             raise
     
-    @lru_cache(maxsize=1000)
-    def _cached_embed_text(self, text: str) -> List[float]:
-        """Cached version of text embedding (synchronous)"""
-        return self._embed_text_sync(text)
+    def _load_sentence_transformer(self, device: str) -> "SentenceTransformer":
+        """Return the shared model for (model_name, device), loading and preparing it on first use"""
+        key = (self.model_name, device)
+        with _MODEL_CACHE_LOCK:
+            model = _MODEL_CACHE.get(key)
+            if model is not None:
+                logger.info(f"Reusing loaded sentence-transformers model: {self.model_name} on {device}")
+                return model
+            
+            logger.info(f"Loading sentence-transformers model: {self.model_name} on {device}")
+            model = SentenceTransformer(self.model_name, device=device)
+            
+            # Tokenize with the Rust (fast) tokenizer; slow Python ones dominate CPU encode time
+            transformer = model._first_module()
+            tokenizer = getattr(transformer, "tokenizer", None)
+            if tokenizer is not None and not tokenizer.is_fast:
+                transformer.tokenizer = AutoTokenizer.from_pretrained(self.model_name, use_fast=True)
+            
+            if device == "cuda":
+                model.half()
+            
+            # Compiled modules do not pickle, so skip when a multi-GPU pool will copy the model
+            multi_gpu = device == "cuda" and torch.cuda.device_count() > 1
+            auto_model = getattr(transformer, "auto_model", None)
+            if EMBED_TORCH_COMPILE and hasattr(torch, "compile") and auto_model is not None and not multi_gpu:
+                try:
+                    # dynamic=True: batch size and sequence length vary between calls
+                    transformer.auto_model = torch.compile(auto_model, dynamic=True)
+                    model.encode(["warmup"], show_progress_bar=False)
+                except Exception as e:
+                    logger.warning(f"torch.compile unavailable, using eager model: {e}")
+                    transformer.auto_model = auto_model
+            
+            _MODEL_CACHE[key] = model
+            return model
     
-    def _embed_text_sync(self, text: str) -> List[float]:
-        """Synchronous text embedding"""
+    @staticmethod
+    def _configure_threads():
+        """Give torch one intra-op pool of EMBED_NUM_THREADS so it does not oversubscribe with BLAS"""
+        torch.set_num_threads(EMBED_NUM_THREADS)
         try:
-            if self.provider == "sentence_transformers":
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Only settable before torch runs parallel work; keep whatever is already in place
+            pass
+        # Inherited by encoder pool workers and libraries loaded after this point
+        os.environ.setdefault("OMP_NUM_THREADS", str(EMBED_NUM_THREADS))
+        os.environ.setdefault("MKL_NUM_THREADS", str(EMBED_NUM_THREADS))
+    
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Embedding cache key: a fixed-size digest of the text"""
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+    
+    def _cache_get(self, key: bytes) -> Optional[np.ndarray]:
+        """Look up a cached embedding, marking it most recently used"""
+        with self._cache_lock:
+            embedding = self._cache.get(key)
+            if embedding is not None:
+                self._cache.move_to_end(key)
+            return embedding
+    
+    def _cache_put(self, key: bytes, embedding: np.ndarray) -> np.ndarray:
+        """Store an embedding, evicting the least recently used beyond cache_size"""
+        # Cached arrays are shared between callers, so freeze them
+        embedding.flags.writeable = False
+        with self._cache_lock:
+            self._cache[key] = embedding
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return embedding
+    
+    async def _run_model(self, func, *args):
+        """Run blocking model work on the service's executor"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+    
+    def _embed_text_sync(self, text: str) -> np.ndarray:
+        """Synchronous text embedding as a float32 vector"""
+        try:
+            if self.provider in LOCAL_PROVIDERS:
                 if not self.model:
                     self._initialize_model()
                 
-                embedding = self.model.encode([text], convert_to_tensor=False)[0]
-                return embedding.tolist() if hasattr(embedding, 'tolist') else list(embedding)
+                embedding = self.model.encode([text], convert_to_tensor=False, normalize_embeddings=True)[0]
+                return np.asarray(embedding, dtype=np.float32)
                 
             elif self.provider == "openai":
                 response = openai.embeddings.create(
                     model=self.model_name,
                     input=text,
-                    encoding_format="float"
+                    encoding_format="base64"
                 )
-                return response.data[0].embedding
+                return _decode_base64_embedding(response.data[0].embedding)
                 
         except Exception as e:
             logger.error(f"Embedding generation failed: {e}")
-            return [0.0] * self.dimensions
+            return np.zeros(self.dimensions, dtype=np.float32)
     
-    async def embed_text(self, text: str, use_cache: bool = True) -> List[float]:
-        """Generate embedding for a single text"""
+    def _encode_sorted(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Encode texts in length order so each batch pads to similar lengths, then restore input order"""
+        order = np.argsort([len(text) for text in texts], kind='stable')
+        sorted_texts = [texts[i] for i in order]
+        if self._pool is not None and len(texts) >= MULTI_PROCESS_MIN_TEXTS:
+            # Shard across the per-GPU processes; chunks stay length-sorted
+            encoded = self.model.encode_multi_process(sorted_texts, self._pool, batch_size=batch_size)
+            encoded /= np.maximum(np.linalg.norm(encoded, axis=1, keepdims=True), 1e-12)
+        else:
+            encoded = self.model.encode(
+                sorted_texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+        embeddings = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+        embeddings[order] = encoded
+        return embeddings
+    
+    async def embed_text(self, text: str, use_cache: bool = True) -> np.ndarray:
+        """Generate embedding for a single text as a float32 vector (read-only when cached)"""
         if not text or not text.strip():
-            return [0.0] * self.dimensions
+            return np.zeros(self.dimensions, dtype=np.float32)
         
         # Clean text
         clean_text = text.strip()
         
-        if use_cache:
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, self._cached_embed_text, clean_text)
-        else:
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, self._embed_text_sync, clean_text)
+        if not use_cache:
+            return await self._run_model(self._embed_text_sync, clean_text)
+        
+        # Cache hits return on the event loop without a thread hand-off
+        key = self._cache_key(clean_text)
+        embedding = self._cache_get(key)
+        if embedding is None:
+            embedding = self._cache_put(key, await self._run_model(self._embed_text_sync, clean_text))
+        return embedding
     
-    async def embed_texts(self, texts: List[str], batch_size: int = 32, use_cache: bool = True) -> List[List[float]]:
-        """Generate embeddings for multiple texts"""
+    async def embed_texts(self, texts: List[str], batch_size: int = 32, use_cache: bool = True) -> np.ndarray:
+        """Generate embeddings for multiple texts as one contiguous (N, D) float32 matrix"""
         if not texts:
-            return []
+            return np.empty((0, self.dimensions), dtype=np.float32)
         
         # Clean texts
         clean_texts = [text.strip() for text in texts if text and text.strip()]
         
         if not clean_texts:
-            return []
+            return np.empty((0, self.dimensions), dtype=np.float32)
         
         embeddings = []
         
         try:
-            if self.provider == "sentence_transformers":
-                # Process in batches
-                for i in range(0, len(clean_texts), batch_size):
-                    batch = clean_texts[i:i + batch_size]
+            if self.provider in LOCAL_PROVIDERS:
+                if use_cache:
+                    # Serve hits from the cache and encode all distinct misses in one batch
+                    keys = [self._cache_key(text) for text in clean_texts]
+                    found = {}
+                    misses = {}
+                    for key, text in zip(keys, clean_texts):
+                        if key in found or key in misses:
+                            continue
+                        embedding = self._cache_get(key)
+                        if embedding is None:
+                            misses[key] = text
+                        else:
+                            found[key] = embedding
                     
-                    if use_cache:
-                        # Process cached items individually
-                        batch_embeddings = []
-                        for text in batch:
-                            embedding = await self.embed_text(text, use_cache=True)
-                            batch_embeddings.append(embedding)
-                        embeddings.extend(batch_embeddings)
-                    else:
-                        # Process batch together
-                        loop = asyncio.get_event_loop()
-                        batch_embeddings = await loop.run_in_executor(
-                            None, 
-                            lambda: self.model.encode(batch, convert_to_tensor=False).tolist()
-                        )
-                        embeddings.extend(batch_embeddings)
+                    if misses:
+                        encoded = await self._run_model(self._encode_sorted, list(misses.values()), batch_size)
+                        for key, embedding in zip(misses, encoded):
+                            found[key] = self._cache_put(key, embedding.copy())
+                    
+                    embeddings = np.stack([found[key] for key in keys])
+                else:
+                    # One length-sorted encode over all texts; batches are formed inside the model
+                    embeddings = await self._run_model(self._encode_sorted, clean_texts, batch_size)
             
             elif self.provider == "openai":
                 # OpenAI has rate limits, so process in smaller batches
                 openai_batch_size = min(batch_size, 100)  # OpenAI limit
+                semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENT_BATCHES)
                 
-                for i in range(0, len(clean_texts), openai_batch_size):
-                    batch = clean_texts[i:i + openai_batch_size]
-                    
-                    loop = asyncio.get_event_loop()
-                    response = await loop.run_in_executor(
-                        None,
-                        lambda: openai.embeddings.create(
+                async def run_batch(batch: List[str]):
+                    async with semaphore:
+                        return await self._aclient.embeddings.create(
                             model=self.model_name,
                             input=batch,
-                            encoding_format="float"
+                            encoding_format="base64"
                         )
-                    )
-                    
-                    batch_embeddings = [item.embedding for item in response.data]
-                    embeddings.extend(batch_embeddings)
-                    
-                    # Small delay to respect rate limits
-                    await asyncio.sleep(0.1)
+                
+                # Overlap request latency across batches; gather keeps input order
+                responses = await asyncio.gather(*(
+                    run_batch(clean_texts[i:i + openai_batch_size])
+                    for i in range(0, len(clean_texts), openai_batch_size)
+                ))
+                for response in responses:
+                    embeddings.extend(_decode_base64_embedding(item.embedding) for item in response.data)
             
-            logger.info(f"Generated {len(embeddings)} embeddings")
-            return embeddings
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Generated %d embeddings", len(embeddings))
+            return np.asarray(embeddings, dtype=np.float32)
             
         except Exception as e:
             logger.error(f"Batch embedding generation failed: {e}")
             # Return zero vectors as fallback
-            return [[0.0] * self.dimensions for _ in clean_texts]
+            return np.zeros((len(clean_texts), self.dimensions), dtype=np.float32)
     
-    async def cosine_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
-        """Calculate cosine similarity between two embeddings"""
+    def pack_candidates(
+        self,
+        embeddings: Union[List[List[float]], np.ndarray]
+    ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+        """Pack embeddings into one contiguous float32 (N, D) matrix with L2-normalized rows
+        
+        Pack a corpus once and pass the matrix to find_most_similar with
+        normalized=True, so repeated queries skip conversion and normalization.
+        With quantized=True the normalized rows are returned as (int8 matrix, row scales).
+        """
+        matrix = np.array(embeddings, dtype=np.float32, order='C', ndmin=2)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0  # zero rows stay zero
+        matrix /= norms
+        if self.quantized:
+            return quantize(matrix)
+        return matrix
+    
+    async def cosine_similarity(
+        self,
+        embedding1: Union[List[float], np.ndarray],
+        embedding2: Union[List[float], np.ndarray],
+        normalized: bool = False
+    ) -> float:
+        """Calculate cosine similarity between two embeddings
+        
+        Set normalized=True for unit-length inputs (anything this service embedded)
+        to reduce the similarity to a dot product.
+        """
         try:
-            # Convert to numpy arrays
-            vec1 = np.array(embedding1)
-            vec2 = np.array(embedding2)
+            # Contiguous float32 views (no copy when already packed) for the fused kernel
+            vec1 = np.ascontiguousarray(embedding1, dtype=np.float32)
+            vec2 = np.ascontiguousarray(embedding2, dtype=np.float32)
             
-            # Calculate cosine similarity
-            dot_product = np.dot(vec1, vec2)
-            norm1 = np.linalg.norm(vec1)
-            norm2 = np.linalg.norm(vec2)
-            
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
-            
-            similarity = dot_product / (norm1 * norm2)
-            return float(similarity)
+            if normalized:
+                return float(np.dot(vec1, vec2))
+            return float(cosine(vec1, vec2))
             
         except Exception as e:
             logger.error(f"Cosine similarity calculation failed: {e}")
@@ -223,20 +513,71 @@ class EmbeddingService:
     async def find_most_similar(
         self, 
         query_embedding: List[float], 
-        candidate_embeddings: List[List[float]],
-        top_k: int = 5
+        candidate_embeddings: Union[List[List[float]], np.ndarray, Tuple[np.ndarray, np.ndarray]],
+        top_k: int = 5,
+        normalized: bool = False
     ) -> List[tuple]:
-        """Find most similar embeddings to query"""
-        similarities = []
+        """Find most similar embeddings to query with one matrix-vector product
+        
+        Set normalized=True when candidate_embeddings comes from pack_candidates
+        or straight from this service's embed_texts.
+        A quantized (int8 matrix, row scales) pair is always treated as normalized.
+        """
+        if top_k <= 0:
+            return []
         
-        for i, candidate in enumerate(candidate_embeddings):
-            similarity = await self.cosine_similarity(query_embedding, candidate)
-            similarities.append((i, similarity))
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) + 1e-12)
         
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        if isinstance(candidate_embeddings, tuple):
+            # int8 path: accumulate in int32, then rescale by both row scales
+            q_candidates, scales = candidate_embeddings
+            if q_candidates.size == 0:
+                return []
+            q_query, q_scale = quantize(query)
+            raw = q_candidates.astype(np.int32) @ q_query[0].astype(np.int32)
+            similarities = raw * (scales * q_scale[0])
+        else:
+            candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+            if candidates.size == 0:
+                return []
+            # Normalize out of place so a caller's cached matrix is never modified
+            if not normalized:
+                candidates = candidates / (np.linalg.norm(candidates, axis=1, keepdims=True) + 1e-12)
+            similarities = np.empty(len(candidates), dtype=np.float32)
+            batch_cosine(
+                np.ascontiguousarray(candidates),
+                np.ascontiguousarray(query, dtype=np.float32),
+                similarities
+            )
+        
+        # Partial selection, then sort only the top-k (stable, so ties keep candidate order)
+        if top_k < len(similarities):
+            if len(similarities) >= TOPK_PARALLEL_MIN_CANDIDATES:
+                top = topk_candidates(similarities, top_k)
+            else:
+                top = np.argpartition(-similarities, top_k - 1)[:top_k]
+            top = np.sort(top)
+        else:
+            top = np.arange(len(similarities))
+        top = top[np.argsort(-similarities[top], kind='stable')][:top_k]
         
-        return similarities[:top_k]
+        return list(zip(top.tolist(), similarities[top].tolist()))
+    
+    async def close(self):
+        """Release the shared encoder pool (stopping it with its last user), model executor and async OpenAI client"""
+        if self._pool is not None:
+            self._pool = None
+            pool = _release_pool(self._pool_key)
+            if pool is not None:
+                await asyncio.to_thread(SentenceTransformer.stop_multi_process_pool, pool)
+                logger.info("Embedding encoder pool stopped")
+        if self._aclient is not None:
+            await self._aclient.close()
+            self._aclient = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
     
     def get_dimensions(self) -> int:
         """Get embedding dimensions"""
@@ -248,7 +589,8 @@ class EmbeddingService:
             'provider': self.provider,
             'model_name': self.model_name,
             'dimensions': self.dimensions,
-            'cache_size': self.cache_size
+            'cache_size': self.cache_size,
+            'quantized': self.quantized
         }
     
     async def health_check(self) -> dict:
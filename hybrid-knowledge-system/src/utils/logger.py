@@ -6,6 +6,12 @@ import logging
 import sys
 from typing import Optional
 
+# One stdout handler shared by every logger; levels are set per logger
+_HANDLER = logging.StreamHandler(sys.stdout)
+_HANDLER.setFormatter(logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+))
+
 def get_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     """Get configured logger instance"""
     
@@ -17,20 +23,7 @@ def get_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     logger.setLevel(getattr(logging, log_level.upper()))
     
     # Avoid duplicate handlers
-    if logger.handlers:
-        return logger
-    
-    # Create handler
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(getattr(logging, log_level.upper()))
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    handler.setFormatter(formatter)
-    
-    # Add handler to logger
-    logger.addHandler(handler)
+    if not logger.handlers:
+        logger.addHandler(_HANDLER)
     
-    return logger
\ No newline at end of file
+    return logger
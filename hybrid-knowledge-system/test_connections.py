@@ -5,36 +5,38 @@ Simple connection test script
 import os
 import asyncio
 from dotenv import load_dotenv
+import httpx
 import neo4j
 import weaviate
-import redis
+import redis.asyncio as redis
 
 load_dotenv()
 
+# Clients shared by every probe; each keeps its connections pooled between calls
+_HTTP = httpx.AsyncClient(timeout=5.0)
+_REDIS = redis.Redis(host='localhost', port=6380, db=0)
+_NEO4J = neo4j.AsyncGraphDatabase.driver(
+    os.getenv('NEO4J_URI', 'bolt://localhost:7688'),
+    auth=(os.getenv('NEO4J_USER'), os.getenv('NEO4J_PASSWORD'))
+)
+
 async def test_neo4j():
     print("Testing Neo4j...")
-    driver = neo4j.GraphDatabase.driver(
-        os.getenv('NEO4J_URI'),
-        auth=(os.getenv('NEO4J_USER'), os.getenv('NEO4J_PASSWORD'))
-    )
     try:
-        with driver.session() as session:
-            result = session.run('RETURN "Neo4j Connected!" as message')
-            message = result.single()['message']
+        async with _NEO4J.session() as session:
+            result = await session.run('RETURN "Neo4j Connected!" as message')
+            message = (await result.single())['message']
             print(f"✅ {message}")
             return True
     except Exception as e:
         print(f"❌ Neo4j error: {e}")
         return False
-    finally:
-        driver.close()
 
 async def test_weaviate():
     print("Testing Weaviate...")
     try:
         # Try HTTP client first
-        import requests
-        response = requests.get("http://localhost:8081/v1/meta", timeout=5)
+        response = await _HTTP.get("http://localhost:8081/v1/meta")
         if response.status_code == 200:
             print("✅ Weaviate Connected (HTTP)!")
             return True
@@ -48,21 +50,29 @@ async def test_weaviate():
 async def test_redis():
     print("Testing Redis...")
     try:
-        r = redis.Redis(host='localhost', port=6380, db=0)
-        r.ping()
+        await _REDIS.ping()
         print("✅ Redis Connected!")
         return True
     except Exception as e:
         print(f"❌ Redis error: {e}")
         return False
 
+async def close_clients():
+    await _HTTP.aclose()
+    await _REDIS.close()
+    await _NEO4J.close()
+
 async def main():
     print("🔍 Testing system connections...")
     print("=" * 40)
 
-    neo4j_ok = await test_neo4j()
-    weaviate_ok = await test_weaviate()
-    redis_ok = await test_redis()
+    try:
+        # Probes are independent network round trips, so run them concurrently
+        neo4j_ok, weaviate_ok, redis_ok = await asyncio.gather(
+            test_neo4j(), test_weaviate(), test_redis()
+        )
+    finally:
+        await close_clients()
 
     print("\n📊 Connection Summary:")
     print(f"Neo4j: {'✅' if neo4j_ok else '❌'}")
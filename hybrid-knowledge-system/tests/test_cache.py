@@ -0,0 +1,95 @@
+"""
+Tests for the two-tier search cache
+"""
+
+import asyncio
+import fnmatch
+
+from src.utils.cache import SEARCH_KEY_PREFIX, CacheManager
+
+
+class FakeRedis:
+    """Minimal async Redis stand-in that records MGET batches"""
+
+    def __init__(self, data=None, mget_delay: float = 0.0):
+        self.data = dict(data or {})
+        self.mget_delay = mget_delay
+        self.mget_calls = []
+
+    async def mget(self, keys):
+        self.mget_calls.append(list(keys))
+        await asyncio.sleep(self.mget_delay)
+        return [self.data.get(key) for key in keys]
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.data):
+            if match is None or fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def unlink(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+def make_cache(client: FakeRedis) -> CacheManager:
+    cache = CacheManager()
+    cache.client = client
+    return cache
+
+
+async def test_concurrent_gets_coalesce_into_one_mget():
+    client = FakeRedis({"a": b"1", "b": b"2"})
+    cache = make_cache(client)
+
+    values = await asyncio.gather(cache.get_bytes("a"), cache.get_bytes("b"), cache.get_bytes("a"))
+
+    assert values == [b"1", b"2", b"1"]
+    assert client.mget_calls == [["a", "b"]]
+
+
+async def test_get_requested_during_inflight_mget_is_resolved():
+    client = FakeRedis({"a": b"1", "b": b"2"}, mget_delay=0.05)
+    cache = make_cache(client)
+
+    first = asyncio.create_task(cache.get_bytes("a"))
+    await asyncio.sleep(0.01)  # 'a' is now inside the in-flight MGET
+    second = asyncio.create_task(cache.get_bytes("b"))
+
+    assert await asyncio.wait_for(first, timeout=1) == b"1"
+    assert await asyncio.wait_for(second, timeout=1) == b"2"
+    assert client.mget_calls == [["a"], ["b"]]
+    assert cache._pending == {}
+
+
+async def test_hits_are_served_from_l1():
+    client = FakeRedis()
+    cache = make_cache(client)
+
+    assert await cache.set("k", {"x": 1})
+    client.data.clear()
+
+    assert await cache.get("k") == {"x": 1}
+    assert client.mget_calls == []
+
+
+async def test_missing_key_returns_none():
+    cache = make_cache(FakeRedis())
+
+    assert await cache.get("missing") is None
+
+
+async def test_invalidate_clears_only_search_keys_from_both_tiers():
+    client = FakeRedis({"other:service": b"keep"})
+    cache = make_cache(client)
+    await cache.set(SEARCH_KEY_PREFIX + "q1", {"x": 1})
+    await cache.set("embedding:q1", [0.5])
+
+    assert await cache.invalidate()
+
+    assert set(client.data) == {"other:service", "embedding:q1"}
+    assert await cache.get(SEARCH_KEY_PREFIX + "q1") is None
+    assert await cache.get("embedding:q1") == [0.5]
+
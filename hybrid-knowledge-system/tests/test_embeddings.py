@@ -0,0 +1,28 @@
+"""
+Tests for the shared multi-GPU encoder pools in the embedding utilities
+"""
+
+from src.utils import embeddings
+
+
+class FakeModel:
+    def __init__(self):
+        self.pools_started = 0
+
+    def start_multi_process_pool(self):
+        self.pools_started += 1
+        return object()
+
+
+def test_services_share_one_pool_until_the_last_release():
+    model = FakeModel()
+    key = ("fake-model", "cuda")
+
+    first = embeddings._acquire_pool(key, model)
+    second = embeddings._acquire_pool(key, model)
+
+    assert first is second
+    assert model.pools_started == 1
+    assert embeddings._release_pool(key) is None
+    assert embeddings._release_pool(key) is first
+    assert key not in embeddings._POOL_CACHE
@@ -0,0 +1,84 @@
+"""
+Tests for Reciprocal Rank Fusion in HybridSearchOrchestrator
+"""
+
+import numpy as np
+import pytest
+
+from src.orchestrator.hybrid_search import RRF_K, HybridConfig, HybridSearchOrchestrator, _rrf_scores
+
+
+def make_orchestrator(**config) -> HybridSearchOrchestrator:
+    # Fusion never touches the backends, so any placeholders will do
+    return HybridSearchOrchestrator(
+        neo4j_client=object(),
+        weaviate_client=object(),
+        cache_manager=object(),
+        config=HybridConfig(**config)
+    )
+
+
+def rrf(semantic, graph, weights=None, **config):
+    orchestrator = make_orchestrator(**config)
+    return orchestrator._reciprocal_rank_fusion(semantic, graph, weights or {'semantic': 0.5, 'graph': 0.5})
+
+
+def test_scores_sum_across_lists():
+    fused = rrf([{'id': 'a'}, {'id': 'b'}], [{'id': 'b'}, {'id': 'c'}])
+
+    scores = {r['id']: r['fusion_score'] for r in fused}
+    assert [r['id'] for r in fused] == ['b', 'a', 'c']
+    assert scores['a'] == pytest.approx(0.5 / (RRF_K + 1))
+    assert scores['b'] == pytest.approx(0.5 / (RRF_K + 2) + 0.5 / (RRF_K + 1))
+    assert scores['c'] == pytest.approx(0.5 / (RRF_K + 2))
+
+
+def test_duplicate_keeps_first_occurrence_and_source():
+    semantic = [{'id': 'x', 'content': 'from weaviate'}]
+    graph = [{'id': 'x', 'content': 'from neo4j'}]
+
+    fused = rrf(semantic, graph)
+
+    assert len(fused) == 1
+    assert fused[0]['content'] == 'from weaviate'
+    assert fused[0]['source'] == 'weaviate'
+
+
+def test_weights_decide_between_lists():
+    fused = rrf([{'id': 's'}], [{'id': 'g'}], weights={'semantic': 0.2, 'graph': 0.8})
+
+    assert [(r['id'], r['source']) for r in fused] == [('g', 'neo4j'), ('s', 'weaviate')]
+
+
+def test_ties_keep_list_order():
+    fused = rrf([{'id': 'a'}], [{'id': 'b'}])
+
+    assert [r['id'] for r in fused] == ['a', 'b']
+
+
+def test_truncates_to_max_results():
+    semantic = [{'id': f"s{i}"} for i in range(10)]
+    graph = [{'id': f"g{i}"} for i in range(10)]
+
+    fused = rrf(semantic, graph, max_results=3)
+
+    assert [r['id'] for r in fused] == ['s0', 'g0', 's1']
+
+
+def test_missing_ids_fall_back_to_list_position():
+    fused = rrf([{'content': 'a'}], [{'content': 'b'}])
+
+    assert len(fused) == 2
+
+
+def test_empty_inputs():
+    assert rrf([], []) == []
+
+
+def test_rrf_scores_kernel_matches_bincount():
+    inverse = np.array([0, 2, 0, 1, 2, 2], dtype=np.intp)
+    contributions = np.array([0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+
+    scores = _rrf_scores(inverse, contributions, 4)
+
+    np.testing.assert_allclose(scores, np.bincount(inverse, weights=contributions, minlength=4))
@@ -0,0 +1,127 @@
+"""
+Tests for result caching in HybridSearchOrchestrator.search
+"""
+
+import asyncio
+
+import numpy as np
+
+from src.orchestrator.hybrid_search import HybridConfig, HybridSearchOrchestrator, SearchStrategy
+from src.utils.cache import SEARCH_KEY_PREFIX
+
+
+class FakeEmbeddingService:
+    model_name = "fake-model"
+
+    async def embed_text(self, text):
+        return np.ones(4, dtype=np.float32)
+
+
+class FakeWeaviate:
+    def __init__(self, results=None):
+        self.results = list(results or [])
+        self.embedding_service = FakeEmbeddingService()
+        self.failed_queries = 0
+
+    async def semantic_search(self, **kwargs):
+        return list(self.results)
+
+
+class FakeNeo4j:
+    def __init__(self, results=None, delay: float = 0.0, fail: bool = False):
+        self.results = list(results or [])
+        self.delay = delay
+        self.fail = fail
+        self.failed_queries = 0
+
+    async def hybrid_search(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            # Mirrors Neo4jClient: the error is logged and counted, not raised
+            self.failed_queries += 1
+            return []
+        return list(self.results)
+
+
+class FakeCache:
+    """In-memory stand-in for CacheManager's byte-level API"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get_bytes(self, key):
+        return self.data.get(key)
+
+    async def set_bytes(self, key, serialized, ttl=None):
+        self.data[key] = serialized
+        return True
+
+
+def make_orchestrator(weaviate, neo4j, **config) -> HybridSearchOrchestrator:
+    return HybridSearchOrchestrator(
+        neo4j_client=neo4j,
+        weaviate_client=weaviate,
+        cache_manager=FakeCache(),
+        config=HybridConfig(**config)
+    )
+
+
+def result_keys(orchestrator: HybridSearchOrchestrator):
+    return [key for key in orchestrator.cache.data if key.startswith(SEARCH_KEY_PREFIX)]
+
+
+async def test_complete_result_is_cached():
+    hit = {'id': 'w1', 'content': 'x', 'score': 0.9}
+    orchestrator = make_orchestrator(FakeWeaviate([hit]), FakeNeo4j())
+
+    result = await orchestrator.search("query", SearchStrategy.BALANCED)
+
+    assert [r['id'] for r in result.results] == ['w1']
+    assert len(result_keys(orchestrator)) == 1
+
+
+async def test_soft_timeout_result_is_not_cached():
+    hit = {'id': 'w1', 'content': 'x', 'score': 0.9}
+    orchestrator = make_orchestrator(FakeWeaviate([hit]), FakeNeo4j(delay=1.0), soft_timeout_ms=10)
+
+    result = await orchestrator.search("query", SearchStrategy.BALANCED)
+
+    assert result.metadata['timed_out'] == ['neo4j']
+    assert result_keys(orchestrator) == []
+
+
+async def test_soft_timeout_empty_result_is_not_negative_cached():
+    orchestrator = make_orchestrator(FakeWeaviate(), FakeNeo4j(delay=1.0), soft_timeout_ms=10)
+
+    await orchestrator.search("query", SearchStrategy.BALANCED)
+    result = await orchestrator.search("query", SearchStrategy.BALANCED)
+
+    assert 'negative_cache' not in result.metadata
+
+
+async def test_empty_result_is_negative_cached_when_all_backends_answer():
+    orchestrator = make_orchestrator(FakeWeaviate(), FakeNeo4j())
+
+    await orchestrator.search("query", SearchStrategy.BALANCED)
+    result = await orchestrator.search("query", SearchStrategy.BALANCED)
+
+    assert result.metadata == {'negative_cache': True}
+
+
+async def test_empty_result_from_failing_backend_is_not_cached():
+    orchestrator = make_orchestrator(FakeWeaviate(), FakeNeo4j(fail=True))
+
+    await orchestrator.search("query", SearchStrategy.BALANCED)
+    result = await orchestrator.search("query", SearchStrategy.BALANCED)
+
+    assert 'negative_cache' not in result.metadata
+    assert result_keys(orchestrator) == []
+
+
+def test_negative_cache_never_matches_other_queries():
+    orchestrator = make_orchestrator(FakeWeaviate(), FakeNeo4j())
+    for i in range(5000):
+        orchestrator._empty_queries.add(f"{SEARCH_KEY_PREFIX}empty{i}")
+
+    assert orchestrator._is_known_empty(f"{SEARCH_KEY_PREFIX}empty1")
+    assert not any(orchestrator._is_known_empty(f"{SEARCH_KEY_PREFIX}other{i}") for i in range(5000))
@@ -0,0 +1,78 @@
+"""
+Tests for the int8 refine index in WeaviateClient.refine_results
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+import src.clients.weaviate_client as weaviate_client
+from src.clients.weaviate_client import WeaviateClient
+
+
+class FakeEmbeddingService:
+    """Deterministic embeddings: every text maps to the same unit vector as the query"""
+
+    def __init__(self, dimensions: int = 8):
+        self.dimensions = dimensions
+        self.embedded = []
+
+    async def embed_text(self, text):
+        return np.ones(self.dimensions, dtype=np.float32)
+
+    async def embed_texts(self, texts):
+        self.embedded.extend(texts)
+        # Texts marked "slow" hold the call open so concurrent refines can interleave
+        if any(text.startswith("slow") for text in texts):
+            await asyncio.sleep(0.05)
+        return np.ones((len(texts), self.dimensions), dtype=np.float32)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(weaviate_client, "REFINE_CACHE_SIZE", 3)
+    monkeypatch.setattr(weaviate_client, "EmbeddingService", FakeEmbeddingService)
+    client = WeaviateClient()
+    client._reset_refine_index(8, capacity=3)
+    return client
+
+
+async def test_repeated_candidates_are_embedded_once(client):
+    await client.refine_results("q", ["a", "b"])
+    await client.refine_results("q", ["b", "a"])
+
+    assert client.embedding_service.embedded == ["a", "b"]
+
+
+async def test_cache_hits_survive_eviction_in_the_same_call(client):
+    await client.refine_results("q", ["a", "b", "c"])
+    results = await client.refine_results("q", ["a", "d"])
+
+    assert [r["content"] for r in results] == ["a", "d"]
+    assert all(r["score"] == pytest.approx(1.0, abs=1e-2) for r in results)
+
+
+async def test_cache_hits_survive_a_concurrent_eviction(client):
+    await client.refine_results("q", ["a"])
+
+    first, _ = await asyncio.gather(
+        client.refine_results("q", ["a", "slow1"]),
+        client.refine_results("q", ["x", "y", "z"])
+    )
+
+    assert sorted(r["content"] for r in first) == ["a", "slow1"]
+    assert all(r["score"] == pytest.approx(1.0, abs=1e-2) for r in first)
+
+
+async def test_batch_larger_than_capacity_grows_the_index(client):
+    candidates = ["a", "b", "c", "d", "e"]
+    results = await client.refine_results("q", candidates)
+
+    assert sorted(r["content"] for r in results) == candidates
+
+
+async def test_blank_candidates_score_zero(client):
+    results = await client.refine_results("q", ["a", "   "], threshold=0.5)
+
+    assert [r["content"] for r in results] == ["a"]
@@ -6,14 +6,43 @@ Creates organized data directory with markdown reports and JSON data files
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import click
 from rich.console import Console
 from rich.progress import track
 
+# C-accelerated parsing when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 console = Console()
 
+# Threads used to read input JSON files concurrently
+JSON_READ_WORKERS = 8
+
+def _read_json(path: Path) -> Any:
+    """Parse one JSON file from its raw bytes"""
+    raw = path.read_bytes()
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+def _read_json_files(paths: List[Path], error_prefix: str) -> List[Any]:
+    """Read and parse JSON files concurrently, reporting and skipping unreadable ones"""
+    
+    def load(path: Path):
+        try:
+            return True, _read_json(path)
+        except Exception as e:
+            console.print(f"{error_prefix} {path}: {e}")
+            return False, None
+    
+    with ThreadPoolExecutor(max_workers=JSON_READ_WORKERS) as executor:
+        return [data for ok, data in executor.map(load, paths) if ok]
+
 class StructuredDataGenerator:
     """Generates structured data organization with markdown reports"""
     
@@ -21,22 +50,18 @@ class StructuredDataGenerator:
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         
+        # Scenario file names, listed once instead of globbing the directory per organization
+        self._scenario_files: Optional[List[Path]] = None
+        
     def load_organization_data(self) -> List[Dict]:
         """Load all organization data"""
         org_dir = self.input_dir / "organizations"
-        organizations = []
         
         if not org_dir.exists():
             console.print(f"❌ Organizations directory not found: {org_dir}")
             return []
         
-        for org_file in org_dir.glob("*.json"):
-            try:
-                with open(org_file, 'r') as f:
-                    org_data = json.load(f)
-                    organizations.append(org_data)
-            except Exception as e:
-                console.print(f"⚠️ Error loading {org_file}: {e}")
+        organizations = _read_json_files(list(org_dir.glob("*.json")), "⚠️ Error loading")
         
         console.print(f"📊 Loaded {len(organizations)} organizations")
         return organizations
@@ -49,30 +74,21 @@ class StructuredDataGenerator:
             return []
         
         try:
-            with open(people_file, 'r') as f:
-                return json.load(f)
+            return _read_json(people_file)
         except Exception as e:
             console.print(f"⚠️ Error loading people for {org_id}: {e}")
             return []
     
     def load_scenarios_for_org(self, org_id: str) -> List[Dict]:
         """Load delegation scenarios for specific organization"""
-        scenarios = []
-        scenario_dir = self.input_dir / "scenarios"
-        
-        if not scenario_dir.exists():
-            return []
+        if self._scenario_files is None:
+            scenario_dir = self.input_dir / "scenarios"
+            self._scenario_files = list(scenario_dir.glob("scenario_*.json")) if scenario_dir.exists() else []
         
         # Find all scenario files for this organization
-        for scenario_file in scenario_dir.glob(f"scenario_{org_id}_*.json"):
-            try:
-                with open(scenario_file, 'r') as f:
-                    scenario_data = json.load(f)
-                    scenarios.append(scenario_data)
-            except Exception as e:
-                console.print(f"⚠️ Error loading scenario {scenario_file}: {e}")
-        
-        return scenarios
+        prefix = f"scenario_{org_id}_"
+        org_files = [path for path in self._scenario_files if path.name.startswith(prefix)]
+        return _read_json_files(org_files, "⚠️ Error loading scenario")
     
     def generate_organization_markdown(self, org: Dict, people: List[Dict], scenarios: List[Dict]) -> str:
         """Generate comprehensive markdown report for organization"""
@@ -4,13 +4,13 @@ Test Unified Persona System - Quick Demo
 Shows the unified ID system with consistent personas across all systems
 """
 
+import hashlib
 import json
 import os
 from pathlib import Path
 from typing import List
 from rich.console import Console
 from rich.table import Table
-import random
 
 # Import persona system
 import sys
@@ -19,6 +19,11 @@ from persona_system import PersonaGenerator, UnifiedPersona
 
 console = Console()
 
+def mock_system_id(prefix: str, persona_id: str) -> str:
+    """Deterministic mock ID for an external system, derived from the persona ID"""
+    digest = hashlib.blake2b(f"{prefix}:{persona_id}".encode(), digest_size=4).hexdigest()
+    return f"{prefix}_{digest}"
+
 def create_sample_personas() -> List[UnifiedPersona]:
     """Create sample personas to demonstrate the system"""
     
@@ -47,8 +52,8 @@ def create_sample_personas() -> List[UnifiedPersona]:
         )
         
         # Simulate API integrations with mock IDs
-        persona.elevenlabs_voice_id = f"elevenlabs_voice_{random.randint(1000, 9999)}"
-        persona.beyond_presence_avatar_id = f"bp_avatar_{random.randint(1000, 9999)}"
+        persona.elevenlabs_voice_id = mock_system_id("elevenlabs_voice", persona.persona_id)
+        persona.beyond_presence_avatar_id = mock_system_id("bp_avatar", persona.persona_id)
         
         personas.append(persona)
     
@@ -182,7 +187,7 @@ def save_demo_output(personas):
         # Save individual persona
         persona_file = output_dir / f"{persona.persona_id}.json"
         with open(persona_file, 'w') as f:
-            json.dump(persona.__dict__, f, indent=2, default=str)
+            json.dump(persona.to_dict(), f, indent=2)
         
         # Add to registry
         registry["personas"][persona.persona_id] = {
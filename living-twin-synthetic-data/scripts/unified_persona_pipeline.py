@@ -16,6 +16,13 @@ from rich.progress import track, Progress, TaskID
 from rich.table import Table
 from dotenv import load_dotenv
 
+# libuv-backed event loop when available
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # Import all our persona systems
 import sys
 sys.path.append('shared')
@@ -179,7 +186,7 @@ class UnifiedPersonaPipeline:
             # Save individual persona file
             persona_file = Path(output_dir) / f"{persona.persona_id}.json"
             with open(persona_file, 'w') as f:
-                json.dump(asdict(persona), f, indent=2)
+                json.dump(persona.to_dict(), f, indent=2)
             
             # Add to registry
             registry["personas"][persona.persona_id] = {
@@ -394,9 +401,10 @@ def main(synthetic_data_dir, output_dir, mock_voice, mock_avatar, org_limit,
     pipeline = UnifiedPersonaPipeline(openai_key, elevenlabs_key, beyond_presence_key)
     
     # Run pipeline
-    result = asyncio.run(pipeline.run_complete_pipeline(
-        synthetic_data_dir, output_dir, mock_voice, mock_avatar, org_limit
-    ))
+    result = asyncio.run(
+        pipeline.run_complete_pipeline(synthetic_data_dir, output_dir, mock_voice, mock_avatar, org_limit),
+        loop_factory=uvloop.new_event_loop if UVLOOP_AVAILABLE else None
+    )
     
     if result and result.get("total_personas", 0) > 0:
         console.print(f"\n✅ [green]Success! Generated {result['total_personas']} unified personas[/green]")
@@ -7,7 +7,7 @@ Creates consistent person identities across text, voice, and avatar generation
 import uuid
 import hashlib
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple
+from typing import Collection, Dict, List, Optional, Tuple
 from enum import Enum
 import random
 
@@ -49,7 +49,7 @@ class SpeechPattern(Enum):
     FORMAL_PRECISE = "formal_precise"
     CASUAL_RELAXED = "casual_relaxed"
 
-@dataclass
+@dataclass(slots=True)
 class PersonaDemographics:
     ethnicity: Ethnicity
     accent: Accent
@@ -58,7 +58,7 @@ class PersonaDemographics:
     region_origin: str  # Where they're from originally
     current_location: str  # Where they work now
 
-@dataclass
+@dataclass(slots=True)
 class PersonaVoice:
     speech_pattern: SpeechPattern
     pace: str           # "fast", "moderate", "slow"
@@ -73,7 +73,7 @@ class PersonaVoice:
     elevenlabs_model: str = "eleven_multilingual_v2"
     voice_settings: Dict = None
 
-@dataclass  
+@dataclass(slots=True)
 class PersonaAvatar:
     # Beyond Presence avatar characteristics
     avatar_id: Optional[str] = None
@@ -90,7 +90,7 @@ class PersonaAvatar:
     clothing_style: str = "business_professional"
     accessories: List[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class UnifiedPersona:
     # Core Identity (consistent across all systems)
     persona_id: str                    # UNIQUE ID: "persona_org001_p0001" 
@@ -129,10 +129,70 @@ class UnifiedPersona:
                 "style": 0.0,
                 "use_speaker_boost": True
             }
+    
+    def to_dict(self) -> Dict:
+        """Plain JSON-ready dict, with enums stored by value"""
+        return asdict(self, dict_factory=_enum_values_factory)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "UnifiedPersona":
+        """Rebuild a persona from the dict produced by to_dict"""
+        demographics = dict(data["demographics"])
+        demographics["ethnicity"] = Ethnicity(demographics["ethnicity"])
+        demographics["accent"] = Accent(demographics["accent"])
+        voice = dict(data["voice"])
+        voice["speech_pattern"] = SpeechPattern(voice["speech_pattern"])
+        return cls(**{
+            **data,
+            "demographics": PersonaDemographics(**demographics),
+            "voice": PersonaVoice(**voice),
+            "avatar": PersonaAvatar(**data["avatar"])
+        })
+
+def _enum_values_factory(items: List[Tuple[str, object]]) -> Dict:
+    """asdict factory that replaces Enum members with their values"""
+    return {key: value.value if isinstance(value, Enum) else value for key, value in items}
 
 class PersonaGenerator:
     """Generates unified personas with consistent characteristics"""
     
+    # Surname/first-name fragments checked in order; first match decides the ethnicity
+    _ETHNICITY_NAME_INDICATORS = (
+        (Ethnicity.ASIAN_SOUTH, ('raj', 'patel', 'singh', 'kumar', 'shah')),
+        (Ethnicity.ASIAN_EAST, ('chen', 'wang', 'li', 'zhang', 'liu')),
+        (Ethnicity.HISPANIC, ('rodriguez', 'martinez', 'lopez', 'garcia')),
+        (Ethnicity.AFRICAN_AMERICAN, ('johnson', 'washington', 'williams', 'brown', 'jackson')),
+    )
+    
+    # Ethnicities whose avatars gesture more by default
+    _HIGH_GESTURE_ETHNICITIES = frozenset({Ethnicity.HISPANIC, Ethnicity.MIDDLE_EASTERN})
+    
+    # Age ranges to sample from (you'd derive this from role level)
+    _AGE_RANGES = ("25-35", "30-40", "35-45", "40-50", "45-55", "50-60")
+    
+    # First names with a known gender; anything else is picked at random
+    _FEMALE_FIRST_NAMES = frozenset({'sarah', 'jennifer', 'mary', 'lisa', 'michelle', 'stephanie', 'rachel'})
+    _MALE_FIRST_NAMES = frozenset({'john', 'michael', 'david', 'james', 'robert', 'william', 'richard'})
+    
+    # Plausible hair and eye colors per ethnicity
+    _HAIR_COLORS = {
+        Ethnicity.CAUCASIAN: ("brown", "blonde", "black", "red"),
+        Ethnicity.AFRICAN_AMERICAN: ("black", "brown"),
+        Ethnicity.HISPANIC: ("black", "brown"),
+        Ethnicity.ASIAN_EAST: ("black", "brown"),
+        Ethnicity.ASIAN_SOUTH: ("black", "brown"),
+        Ethnicity.MIDDLE_EASTERN: ("black", "brown")
+    }
+    _EYE_COLORS = {
+        Ethnicity.CAUCASIAN: ("blue", "green", "brown", "hazel"),
+        Ethnicity.AFRICAN_AMERICAN: ("brown", "hazel"),
+        Ethnicity.HISPANIC: ("brown", "hazel"),
+        Ethnicity.ASIAN_EAST: ("brown", "black"),
+        Ethnicity.ASIAN_SOUTH: ("brown", "black"),
+        Ethnicity.MIDDLE_EASTERN: ("brown", "green")
+    }
+    _DEFAULT_COLORS = ("brown",)
+    
     def __init__(self):
         self.ethnicity_demographics = self._setup_demographic_mappings()
         
@@ -184,8 +244,7 @@ class PersonaGenerator:
         region_origin = random.choice(demo_data["regions"])
         
         # Age range based on role level (you'd pass this in)
-        age_ranges = ["25-35", "30-40", "35-45", "40-50", "45-55", "50-60"]
-        age_range = random.choice(age_ranges)
+        age_range = random.choice(self._AGE_RANGES)
         
         # Gender inference (very basic - you'd use a proper library)
         gender = self._infer_gender_from_name(name)
@@ -200,7 +259,7 @@ class PersonaGenerator:
         )
     
     def generate_voice_characteristics(self, demographics: PersonaDemographics, 
-                                     personality: List[str], role_level: int) -> PersonaVoice:
+                                     personality: Collection[str], role_level: int) -> PersonaVoice:
         """Generate voice characteristics based on demographics and personality"""
         
         # Speech pattern based on personality
@@ -260,34 +319,42 @@ class PersonaGenerator:
         )
     
     def generate_avatar_characteristics(self, demographics: PersonaDemographics,
-                                      personality: List[str], role_level: int) -> PersonaAvatar:
+                                      personality: Collection[str], role_level: int) -> PersonaAvatar:
         """Generate avatar characteristics for Beyond Presence"""
         
+        # Read each demographic field and trait flag once; the rules below only test locals
+        ethnicity = demographics.ethnicity
+        accent = demographics.accent
+        creative = "creative" in personality
+        energetic = "energetic" in personality
+        analytical = "analytical" in personality
+        collaborative = "collaborative" in personality
+        
         # Appearance style based on role level
         appearance_style = "professional"
         if role_level <= 2:
             appearance_style = "executive"
-        elif "creative" in personality:
+        elif creative:
             appearance_style = "creative"
         
         # Body language based on personality
         body_language = "confident"
-        if "energetic" in personality:
+        if energetic:
             body_language = "energetic"
-        elif "collaborative" in personality:
+        elif collaborative:
             body_language = "approachable"
-        elif "analytical" in personality:
+        elif analytical:
             body_language = "reserved"
         
         # Gesture frequency based on demographics and personality
         gesture_frequency = "moderate"
-        if demographics.ethnicity in [Ethnicity.HISPANIC, Ethnicity.MIDDLE_EASTERN]:
+        if ethnicity in self._HIGH_GESTURE_ETHNICITIES:
             gesture_frequency = "high"
-        elif demographics.accent == Accent.AMERICAN_NEW_YORK:
+        elif accent == Accent.AMERICAN_NEW_YORK:
             gesture_frequency = "high"
-        elif "energetic" in personality:
+        elif energetic:
             gesture_frequency = "high"
-        elif "analytical" in personality:
+        elif analytical:
             gesture_frequency = "low"
         
         # Clothing style based on role level
@@ -296,7 +363,7 @@ class PersonaGenerator:
             clothing_style = "executive_formal"
         elif role_level >= 4:
             clothing_style = "business_casual"
-        elif "creative" in personality:
+        elif creative:
             clothing_style = "smart_casual"
         
         return PersonaAvatar(
@@ -305,9 +372,9 @@ class PersonaGenerator:
             gesture_frequency=gesture_frequency,
             eye_contact_style="direct" if "confident" in personality else "moderate",
             posture="upright" if role_level <= 3 else "relaxed",
-            hair_color=self._hair_color_for_ethnicity(demographics.ethnicity),
+            hair_color=self._hair_color_for_ethnicity(ethnicity),
             hair_style="professional",
-            eye_color=self._eye_color_for_ethnicity(demographics.ethnicity),
+            eye_color=self._eye_color_for_ethnicity(ethnicity),
             clothing_style=clothing_style,
             accessories=self._accessories_for_role(role_level)
         )
@@ -319,8 +386,11 @@ class PersonaGenerator:
         
         persona_id = self.generate_persona_id(org_id, person_index)
         demographics = self.generate_demographics(name, region_bias)
-        voice = self.generate_voice_characteristics(demographics, personality, level)
-        avatar = self.generate_avatar_characteristics(demographics, personality, level)
+        
+        # Hash the traits once so every trait check below is a constant-time lookup
+        traits = frozenset(personality)
+        voice = self.generate_voice_characteristics(demographics, traits, level)
+        avatar = self.generate_avatar_characteristics(demographics, traits, level)
         
         return UnifiedPersona(
             persona_id=persona_id,
@@ -330,9 +400,9 @@ class PersonaGenerator:
             level=level,
             demographics=demographics,
             personality_traits=personality,
-            communication_style=self._communication_style_from_personality(personality),
-            decision_making_style=self._decision_style_from_personality(personality),
-            stress_response=self._stress_response_from_personality(personality),
+            communication_style=self._communication_style_from_personality(traits),
+            decision_making_style=self._decision_style_from_personality(traits),
+            stress_response=self._stress_response_from_personality(traits),
             voice=voice,
             avatar=avatar
         )
@@ -343,33 +413,24 @@ class PersonaGenerator:
         name_lower = name.lower()
         
         # Very basic patterns - replace with proper name database
-        if any(indicator in name_lower for indicator in ['raj', 'patel', 'singh', 'kumar', 'shah']):
-            return Ethnicity.ASIAN_SOUTH
-        elif any(indicator in name_lower for indicator in ['chen', 'wang', 'li', 'zhang', 'liu']):
-            return Ethnicity.ASIAN_EAST
-        elif any(indicator in name_lower for indicator in ['rodriguez', 'martinez', 'lopez', 'garcia']):
-            return Ethnicity.HISPANIC
-        elif any(indicator in name_lower for indicator in ['johnson', 'washington', 'williams', 'brown', 'jackson']):
-            return Ethnicity.AFRICAN_AMERICAN
-        else:
-            return Ethnicity.CAUCASIAN
+        for ethnicity, indicators in self._ETHNICITY_NAME_INDICATORS:
+            if any(indicator in name_lower for indicator in indicators):
+                return ethnicity
+        return Ethnicity.CAUCASIAN
     
     def _infer_gender_from_name(self, name: str) -> str:
         """Basic gender inference - you'd use a proper library in production"""
         first_name = name.split()[0].lower()
         
         # Very basic patterns
-        female_indicators = ['sarah', 'jennifer', 'mary', 'lisa', 'michelle', 'stephanie', 'rachel']
-        male_indicators = ['john', 'michael', 'david', 'james', 'robert', 'william', 'richard']
-        
-        if first_name in female_indicators:
+        if first_name in self._FEMALE_FIRST_NAMES:
             return "female"
-        elif first_name in male_indicators:
+        elif first_name in self._MALE_FIRST_NAMES:
             return "male"
         else:
             return random.choice(["male", "female"])
     
-    def _communication_style_from_personality(self, personality: List[str]) -> str:
+    def _communication_style_from_personality(self, personality: Collection[str]) -> str:
         if "direct" in personality:
             return "direct"
         elif "diplomatic" in personality:
@@ -377,7 +438,7 @@ class PersonaGenerator:
         else:
             return "collaborative"
     
-    def _decision_style_from_personality(self, personality: List[str]) -> str:
+    def _decision_style_from_personality(self, personality: Collection[str]) -> str:
         if "decisive" in personality:
             return "quick"
         elif "analytical" in personality:
@@ -385,7 +446,7 @@ class PersonaGenerator:
         else:
             return "consultative"
     
-    def _stress_response_from_personality(self, personality: List[str]) -> str:
+    def _stress_response_from_personality(self, personality: Collection[str]) -> str:
         if "calm" in personality:
             return "calm"
         elif "urgent" in personality:
@@ -394,26 +455,10 @@ class PersonaGenerator:
             return "detailed"
     
     def _hair_color_for_ethnicity(self, ethnicity: Ethnicity) -> str:
-        color_map = {
-            Ethnicity.CAUCASIAN: ["brown", "blonde", "black", "red"],
-            Ethnicity.AFRICAN_AMERICAN: ["black", "brown"],
-            Ethnicity.HISPANIC: ["black", "brown"],
-            Ethnicity.ASIAN_EAST: ["black", "brown"],
-            Ethnicity.ASIAN_SOUTH: ["black", "brown"],
-            Ethnicity.MIDDLE_EASTERN: ["black", "brown"]
-        }
-        return random.choice(color_map.get(ethnicity, ["brown"]))
+        return random.choice(self._HAIR_COLORS.get(ethnicity, self._DEFAULT_COLORS))
     
     def _eye_color_for_ethnicity(self, ethnicity: Ethnicity) -> str:
-        color_map = {
-            Ethnicity.CAUCASIAN: ["blue", "green", "brown", "hazel"],
-            Ethnicity.AFRICAN_AMERICAN: ["brown", "hazel"],
-            Ethnicity.HISPANIC: ["brown", "hazel"],
-            Ethnicity.ASIAN_EAST: ["brown", "black"],
-            Ethnicity.ASIAN_SOUTH: ["brown", "black"],
-            Ethnicity.MIDDLE_EASTERN: ["brown", "green"]
-        }
-        return random.choice(color_map.get(ethnicity, ["brown"]))
+        return random.choice(self._EYE_COLORS.get(ethnicity, self._DEFAULT_COLORS))
     
     def _accessories_for_role(self, role_level: int) -> List[str]:
         if role_level == 1:  # CEO
@@ -16,7 +16,7 @@ from faker import Faker
 
 fake = Faker()
 
-@dataclass
+@dataclass(slots=True)
 class Person:
     """Person within an organization"""
     id: str
@@ -37,7 +37,7 @@ class Person:
     gender: str
     cultural_background: str
 
-@dataclass
+@dataclass(slots=True)
 class Organization:
     """Organization profile"""
     id: str
@@ -61,7 +61,7 @@ class Organization:
     values: List[str]
     strategic_priorities: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class DelegationScenario:
     """Delegation scenario with chain of responses"""
     id: str
@@ -0,0 +1,43 @@
+"""
+Tests for UnifiedPersona serialization
+"""
+
+import json
+import sys
+sys.path.append('shared')
+
+from persona_system import Accent, Ethnicity, PersonaGenerator, SpeechPattern, UnifiedPersona
+
+
+def make_persona() -> UnifiedPersona:
+    persona = PersonaGenerator().create_unified_persona(
+        org_id="org_001",
+        person_index=0,
+        name="Rajesh Patel",
+        role="VP Engineering",
+        level=2,
+        personality=["analytical", "collaborative", "calm"],
+        region_bias="United States"
+    )
+    persona.elevenlabs_voice_id = "voice_123"
+    return persona
+
+
+def test_to_dict_is_json_ready():
+    data = make_persona().to_dict()
+
+    assert isinstance(data["demographics"]["ethnicity"], str)
+    assert isinstance(data["demographics"]["accent"], str)
+    assert isinstance(data["voice"]["speech_pattern"], str)
+    json.dumps(data)
+
+
+def test_from_dict_round_trips():
+    persona = make_persona()
+
+    restored = UnifiedPersona.from_dict(json.loads(json.dumps(persona.to_dict())))
+
+    assert restored == persona
+    assert isinstance(restored.demographics.ethnicity, Ethnicity)
+    assert isinstance(restored.demographics.accent, Accent)
+    assert isinstance(restored.voice.speech_pattern, SpeechPattern)
@@ -6,17 +6,33 @@ Creates unique voices based on demographics, personality, and regional character
 
 import os
 import json
+import hashlib
 import asyncio
 import aiohttp
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Mapping, Optional, Tuple
 from dataclasses import asdict
+from types import MappingProxyType
 import random
 from pathlib import Path
 import click
 from rich.console import Console
-from rich.progress import track
+from rich.progress import Progress, track
 from dotenv import load_dotenv
 
+# C-accelerated serialization when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# libuv-backed event loop when available
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # Import our persona system
 import sys
 sys.path.append('../shared')
@@ -25,17 +41,67 @@ from persona_system import UnifiedPersona, Ethnicity, Accent, SpeechPattern, Per
 load_dotenv()
 console = Console()
 
+# Maximum number of ElevenLabs speech requests in flight at once
+MAX_CONCURRENT_SAMPLES = int(os.getenv("ELEVENLABS_MAX_CONCURRENCY", "5"))
+
+
+def _freeze(value):
+    """Recursively convert dicts to read-only mappings and lists to tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 class ElevenLabsEnhancedGenerator:
     """Enhanced ElevenLabs integration with detailed persona mapping"""
     
+    # Default ElevenLabs voice settings; per-persona settings are overlays on this read-only template
+    _BASE_VOICE_SETTINGS = MappingProxyType({
+        "stability": 0.75,
+        "similarity_boost": 0.75,
+        "style": 0.0,
+        "use_speaker_boost": True
+    })
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://api.elevenlabs.io/v1"
         self.persona_generator = PersonaGenerator()
         
-        # Pre-defined voice mappings for different persona types
-        self.voice_mappings = self._setup_voice_mappings()
+        # Pre-defined voice mappings for different persona types, frozen so selected voices can be shared
+        self.voice_mappings = _freeze(self._setup_voice_mappings())
+        
+        # Selected voice per (gender, accent, speech_pattern, sorted traits), shared by personas with the same profile
+        self._voice_by_profile: Dict[Tuple[str, str, str, Tuple[str, ...]], Mapping[str, Any]] = {}
+        
+        # Content address of each distinct voice settings block, keyed by its sorted items
+        self._settings_refs: Dict[Tuple[Tuple[str, Any], ...], str] = {}
         
+        # Selected voice and custom settings per persona_id, so each persona is styled once
+        self._voice_profiles: Dict[str, Tuple[Mapping[str, Any], Dict]] = {}
+        
+        # Text-to-speech URL and request body (minus text) per (persona_id, voice_id)
+        self._speech_requests: Dict[Tuple[str, str], Tuple[str, MappingProxyType]] = {}
+        
+        # One pooled HTTP session for every ElevenLabs request, created on first use
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Create the shared keep-alive session on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=30),
+                headers={"xi-api-key": self.api_key}
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
     def _setup_voice_mappings(self) -> Dict:
         """Map demographic/personality combinations to ElevenLabs voices"""
         return {
@@ -86,13 +152,24 @@ class ElevenLabsEnhancedGenerator:
             }
         }
     
-    def select_voice_for_persona(self, persona: UnifiedPersona) -> Dict[str, Any]:
+    def select_voice_for_persona(self, persona: UnifiedPersona) -> Mapping[str, Any]:
         """Intelligently select ElevenLabs voice based on persona characteristics"""
         
         # Build selection criteria
-        gender = persona.demographics.gender
-        accent = persona.demographics.accent.value
-        personality = persona.personality_traits
+        key = (
+            persona.demographics.gender,
+            persona.demographics.accent.value,
+            persona.voice.speech_pattern.value,
+            tuple(sorted(persona.personality_traits))
+        )
+        voice = self._voice_by_profile.get(key)
+        if voice is None:
+            voice = self._voice_by_profile[key] = self._score_voices(*key)
+        return voice
+    
+    def _score_voices(self, gender: str, accent: str, speech_pattern: str,
+                      personality: Tuple[str, ...]) -> Mapping[str, Any]:
+        """Score every voice option against one selection profile"""
         
         # Score each voice option
         best_voice = None
@@ -121,7 +198,6 @@ class ElevenLabsEnhancedGenerator:
             score += len(personality_matches) * 3
             
             # Speech pattern match (medium weight)
-            speech_pattern = persona.voice.speech_pattern.value
             if "confident" in speech_pattern and "confident" in voice_data["characteristics"]:
                 score += 4
             elif "analytical" in speech_pattern and "analytical" in voice_data["characteristics"]:
@@ -139,38 +215,74 @@ class ElevenLabsEnhancedGenerator:
         
         return best_voice
     
-    async def create_custom_voice_settings(self, persona: UnifiedPersona, base_voice: Dict) -> Dict:
+    def create_custom_voice_settings(self, persona: UnifiedPersona, base_voice: Mapping[str, Any]) -> Dict:
         """Create custom voice settings based on persona characteristics"""
         
         # Base settings
-        settings = {
-            "stability": 0.75,
-            "similarity_boost": 0.75, 
-            "style": 0.0,
-            "use_speaker_boost": True
-        }
+        stability = self._BASE_VOICE_SETTINGS["stability"]
+        style = self._BASE_VOICE_SETTINGS["style"]
         
         # Adjust based on personality
         if "energetic" in persona.personality_traits:
-            settings["stability"] = 0.6  # Less stable = more dynamic
-            settings["style"] = 0.3      # More stylistic variation
+            stability = 0.6  # Less stable = more dynamic
+            style = 0.3      # More stylistic variation
         elif "analytical" in persona.personality_traits:
-            settings["stability"] = 0.9  # Very stable = consistent
-            settings["style"] = 0.1      # Minimal stylistic variation
+            stability = 0.9  # Very stable = consistent
+            style = 0.1      # Minimal stylistic variation
         
         # Adjust based on speech pattern
         if persona.voice.speech_pattern == SpeechPattern.FAST_ENERGETIC:
-            settings["style"] = 0.4
+            style = 0.4
         elif persona.voice.speech_pattern == SpeechPattern.SLOW_ANALYTICAL:
-            settings["stability"] = 0.95
+            stability = 0.95
         
         # Adjust based on role level
         if persona.level <= 2:  # Senior roles
-            settings["stability"] = 0.85  # More authoritative consistency
+            stability = 0.85  # More authoritative consistency
         
-        return settings
+        # Overlay onto a fresh copy of the template; the template itself is never mutated
+        return {**self._BASE_VOICE_SETTINGS, "stability": stability, "style": style}
     
-    async def generate_voice_persona_description(self, persona: UnifiedPersona) -> str:
+    def get_voice_profile(self, persona: UnifiedPersona) -> Tuple[Mapping[str, Any], Dict]:
+        """Return (selected voice, custom settings) for a persona, computed once per persona_id"""
+        
+        profile = self._voice_profiles.get(persona.persona_id)
+        if profile is None:
+            voice_data = self.select_voice_for_persona(persona)
+            settings = self.create_custom_voice_settings(persona, voice_data)
+            profile = self._voice_profiles[persona.persona_id] = (voice_data, settings)
+        return profile
+    
+    def _speech_request(self, persona: UnifiedPersona) -> Tuple[str, MappingProxyType]:
+        """Return the TTS URL and text-independent request body for a persona, built once"""
+        
+        # Select appropriate voice and custom settings (reused from the voice mapping)
+        voice_data, voice_settings = self.get_voice_profile(persona)
+        voice_id = persona.elevenlabs_voice_id or voice_data["voice_id"]
+        
+        key = (persona.persona_id, voice_id)
+        request = self._speech_requests.get(key)
+        if request is None:
+            request = self._speech_requests[key] = (
+                f"{self.base_url}/text-to-speech/{voice_id}",
+                MappingProxyType({
+                    "model_id": persona.voice.elevenlabs_model,
+                    "voice_settings": voice_settings
+                })
+            )
+        return request
+    
+    def _settings_ref(self, settings: Dict) -> str:
+        """Return a stable content hash for a voice settings block"""
+        
+        key = tuple(sorted(settings.items()))
+        ref = self._settings_refs.get(key)
+        if ref is None:
+            canonical = json.dumps(settings, sort_keys=True).encode()
+            ref = self._settings_refs[key] = hashlib.blake2b(canonical, digest_size=8).hexdigest()
+        return ref
+    
+    def generate_voice_persona_description(self, persona: UnifiedPersona) -> str:
         """Generate description for voice persona creation"""
         
         demo = persona.demographics
@@ -209,7 +321,7 @@ class ElevenLabsEnhancedGenerator:
         
         url = f"{self.base_url}/voices/add"
         
-        description = await self.generate_voice_persona_description(persona)
+        description = self.generate_voice_persona_description(persona)
         
         # Prepare the request
         data = {
@@ -224,28 +336,24 @@ class ElevenLabsEnhancedGenerator:
             })
         }
         
-        headers = {
-            "xi-api-key": self.api_key
-        }
-        
         # Add audio files (you'd implement file handling here)
         files = {}
-        for i, sample_path in enumerate(audio_samples[:25]):  # Max 25 samples
-            files[f"files[{i}]"] = open(sample_path, "rb")
-        
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=data, headers=headers) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        voice_id = result.get("voice_id")
-                        console.print(f"✅ Created custom voice for {persona.name}: {voice_id}")
-                        return voice_id
-                    else:
-                        error = await response.text()
-                        console.print(f"❌ Failed to create voice for {persona.name}: {error}")
-                        return None
-        except Exception as e:
+            for i, sample_path in enumerate(audio_samples[:25]):  # Max 25 samples
+                files[f"files[{i}]"] = open(sample_path, "rb")
+            
+            session = await self._ensure_session()
+            async with session.post(url, data=data) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    voice_id = result.get("voice_id")
+                    console.print(f"✅ Created custom voice for {persona.name}: {voice_id}")
+                    return voice_id
+                else:
+                    error = await response.text()
+                    console.print(f"❌ Failed to create voice for {persona.name}: {error}")
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
             console.print(f"❌ Error creating voice for {persona.name}: {e}")
             return None
         finally:
@@ -253,51 +361,35 @@ class ElevenLabsEnhancedGenerator:
             for file_handle in files.values():
                 file_handle.close()
     
+    def write_mock_speech(self, persona: UnifiedPersona, text: str, output_path: str):
+        """Create mock audio file (blocking; no API call)"""
+        mock_content = f"[MOCK AUDIO for {persona.name}: {text[:50]}...]"
+        Path(output_path).write_text(mock_content)
+    
     async def generate_speech(self, persona: UnifiedPersona, text: str, 
                             output_path: str, mock: bool = False) -> bool:
         """Generate speech for a specific persona"""
         
         if mock:
-            # Create mock audio file
-            mock_content = f"[MOCK AUDIO for {persona.name}: {text[:50]}...]"
-            with open(output_path, 'w') as f:
-                f.write(mock_content)
+            await asyncio.to_thread(self.write_mock_speech, persona, text, output_path)
             return True
         
-        # Select appropriate voice
-        voice_data = self.select_voice_for_persona(persona)
-        voice_id = persona.elevenlabs_voice_id or voice_data["voice_id"]
-        
-        # Get custom voice settings
-        voice_settings = await self.create_custom_voice_settings(persona, voice_data)
-        
         # Generate speech
-        url = f"{self.base_url}/text-to-speech/{voice_id}"
-        
-        payload = {
-            "text": text,
-            "model_id": persona.voice.elevenlabs_model,
-            "voice_settings": voice_settings
-        }
-        
-        headers = {
-            "xi-api-key": self.api_key,
-            "Content-Type": "application/json"
-        }
+        url, request_template = self._speech_request(persona)
+        payload = {"text": text, **request_template}
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        audio_content = await response.read()
-                        with open(output_path, 'wb') as f:
-                            f.write(audio_content)
-                        return True
-                    else:
-                        error = await response.text()
-                        console.print(f"❌ Failed to generate speech for {persona.name}: {error}")
-                        return False
-        except Exception as e:
+            session = await self._ensure_session()
+            async with session.post(url, json=payload) as response:
+                if response.status == 200:
+                    audio_content = await response.read()
+                    await asyncio.to_thread(Path(output_path).write_bytes, audio_content)
+                    return True
+                else:
+                    error = await response.text()
+                    console.print(f"❌ Failed to generate speech for {persona.name}: {error}")
+                    return False
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
             console.print(f"❌ Error generating speech for {persona.name}: {e}")
             return False
     
@@ -313,16 +405,27 @@ class ElevenLabsEnhancedGenerator:
                 "elevenlabs_model": "eleven_multilingual_v2",
                 "mock_mode": mock
             },
-            "personas": {}
+            "personas": {},
+            # Shared payloads referenced from each persona's elevenlabs_config
+            "voices": {},
+            "voice_settings": {}
         }
+        voices = voice_mapping["voices"]
+        voice_settings = voice_mapping["voice_settings"]
         
         for persona in track(personas, description="Creating voice personas..."):
             
-            # Select best voice for this persona
-            voice_data = self.select_voice_for_persona(persona)
+            # Select best voice and custom settings for this persona
+            voice_data, settings = self.get_voice_profile(persona)
             
-            # Get custom settings
-            settings = await self.create_custom_voice_settings(persona, voice_data)
+            # Store identical settings and voice characteristics once
+            settings_ref = self._settings_ref(settings)
+            voice_settings.setdefault(settings_ref, settings)
+            if voice_data["voice_id"] not in voices:
+                voices[voice_data["voice_id"]] = {
+                    "voice_name": voice_data["name"],
+                    "characteristics": voice_data["characteristics"]
+                }
             
             # Store mapping
             voice_mapping["personas"][persona.persona_id] = {
@@ -347,21 +450,40 @@ class ElevenLabsEnhancedGenerator:
                     "voice_id": voice_data["voice_id"],
                     "voice_name": voice_data["name"],
                     "model": persona.voice.elevenlabs_model,
-                    "settings": settings,
-                    "characteristics": voice_data["characteristics"]
+                    "settings_ref": settings_ref
                 },
                 "beyond_presence_ready": True  # Flag for avatar generation
             }
         
         # Save mapping
         mapping_file = Path(output_dir) / "enhanced_voice_mapping.json"
-        with open(mapping_file, 'w') as f:
-            json.dump(voice_mapping, f, indent=2)
+        await asyncio.to_thread(self._save_mapping, mapping_file, voice_mapping)
         
         console.print(f"✅ Created enhanced voice mapping for {len(personas)} personas")
         console.print(f"💾 Saved to {mapping_file}")
         
         return voice_mapping
+    
+    @staticmethod
+    def _save_mapping(mapping_file: Path, voice_mapping: Dict):
+        """Encode and write the voice mapping (blocking; run off the event loop)"""
+        if ORJSON_AVAILABLE:
+            mapping_file.write_bytes(orjson.dumps(voice_mapping, option=orjson.OPT_INDENT_2))
+        else:
+            with open(mapping_file, 'w') as f:
+                json.dump(voice_mapping, f, indent=2)
+
+def load_personas(input_dir: str) -> List[UnifiedPersona]:
+    """Load every persona_*.json file in a directory"""
+    
+    personas = []
+    for persona_file in sorted(Path(input_dir).glob("persona_*.json")):
+        raw = persona_file.read_bytes()
+        data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+        personas.append(UnifiedPersona.from_dict(data))
+    
+    console.print(f"📂 Loaded {len(personas)} personas from {input_dir}")
+    return personas
 
 @click.command()
 @click.option('--input-dir', required=True, help='Directory with persona JSON files')
@@ -380,26 +502,96 @@ def main(input_dir, output_dir, mock, create_samples):
     # Initialize generator
     generator = ElevenLabsEnhancedGenerator(api_key or "mock")
     
-    # Load personas (you'd implement persona loading from your unified format)
-    # For now, create sample personas
-    persona_gen = PersonaGenerator()
+    # Load personas written by the unified persona pipeline
+    personas = load_personas(input_dir)
     
-    sample_personas = [
-        persona_gen.create_unified_persona("org_001", 1, "Rajesh Patel", "VP Engineering", 2, 
-                                         ["analytical", "collaborative"]),
-        persona_gen.create_unified_persona("org_001", 2, "Sarah Johnson", "Marketing Director", 3,
-                                         ["energetic", "creative"]),
-        persona_gen.create_unified_persona("org_001", 3, "Miguel Rodriguez", "Sales Manager", 3,
-                                         ["confident", "persuasive"])
-    ]
+    if not personas:
+        # Fall back to sample personas
+        console.print(f"⚠️ No persona files found in {input_dir}, using sample personas")
+        persona_gen = PersonaGenerator()
+        
+        personas = [
+            persona_gen.create_unified_persona("org_001", 1, "Rajesh Patel", "VP Engineering", 2, 
+                                             ["analytical", "collaborative"]),
+            persona_gen.create_unified_persona("org_001", 2, "Sarah Johnson", "Marketing Director", 3,
+                                             ["energetic", "creative"]),
+            persona_gen.create_unified_persona("org_001", 3, "Miguel Rodriguez", "Sales Manager", 3,
+                                             ["confident", "persuasive"])
+        ]
     
     # Run generation
-    asyncio.run(generate_enhanced_voices(generator, sample_personas, output_dir, mock, create_samples))
+    asyncio.run(
+        generate_enhanced_voices(generator, personas, output_dir, mock, create_samples),
+        loop_factory=uvloop.new_event_loop if UVLOOP_AVAILABLE else None
+    )
+
+def _ndjson_line(entry: Dict) -> bytes:
+    """Serialize one record as a newline-terminated JSON line"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(entry) + b"\n"
+    return json.dumps(entry).encode() + b"\n"
+
+def _append_line(fh, line: bytes):
+    """Write and flush one line so it survives an interrupted run"""
+    fh.write(line)
+    fh.flush()
+
+def _generate_mock_samples(generator, personas, output_dir, sample_text, samples_file: Path) -> int:
+    """Write mock samples and their manifest in a plain loop"""
+    
+    with samples_file.open('wb') as samples_fh:
+        for persona in track(personas, description="Generating voice samples...", console=console):
+            output_file = Path(output_dir) / f"sample_{persona.persona_id}.mp3"
+            generator.write_mock_speech(persona, sample_text, str(output_file))
+            
+            _append_line(samples_fh, _ndjson_line({
+                "persona_id": persona.persona_id,
+                "file": output_file.name,
+                "success": True
+            }))
+    return len(personas)
+
+async def _generate_samples(generator, personas, output_dir, sample_text, samples_file: Path) -> int:
+    """Generate real samples concurrently, recording each one as it completes"""
+    
+    # Bound in-flight TTS requests instead of running them one at a time
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SAMPLES)
+    
+    async def generate_sample(persona: UnifiedPersona):
+        output_file = Path(output_dir) / f"sample_{persona.persona_id}.mp3"
+        async with semaphore:
+            success = await generator.generate_speech(persona, sample_text, str(output_file))
+        return persona, output_file, success
+    
+    generated = 0
+    samples_fh = await asyncio.to_thread(samples_file.open, 'wb')
+    try:
+        with Progress(console=console) as progress:
+            task = progress.add_task("Generating voice samples...", total=len(personas))
+            for next_sample in asyncio.as_completed([generate_sample(persona) for persona in personas]):
+                persona, output_file, success = await next_sample
+                progress.advance(task)
+                
+                if success:
+                    generated += 1
+                else:
+                    console.print(f"❌ Failed to generate sample for {persona.name}")
+                
+                line = _ndjson_line({
+                    "persona_id": persona.persona_id,
+                    "file": output_file.name,
+                    "success": success
+                })
+                await asyncio.to_thread(_append_line, samples_fh, line)
+    finally:
+        await asyncio.to_thread(samples_fh.close)
+        await generator.close()
+    return generated
 
 async def generate_enhanced_voices(generator, personas, output_dir, mock, create_samples):
     """Main generation logic"""
     
-    os.makedirs(output_dir, exist_ok=True)
+    await asyncio.to_thread(os.makedirs, output_dir, exist_ok=True)
     
     # Create voice mappings
     voice_mapping = await generator.create_persona_voice_mapping(personas, output_dir, mock)
@@ -410,18 +602,23 @@ async def generate_enhanced_voices(generator, personas, output_dir, mock, create
         
         sample_text = "Hello, this is a test of the enhanced voice generation system. I'm speaking as my professional persona for business meetings and presentations."
         
-        for persona in personas:
-            output_file = Path(output_dir) / f"sample_{persona.persona_id}.mp3"
-            success = await generator.generate_speech(persona, sample_text, str(output_file), mock)
-            
-            if success:
-                console.print(f"✅ Generated sample for {persona.name}")
-            else:
-                console.print(f"❌ Failed to generate sample for {persona.name}")
+        # Record each sample as it finishes, so a partial run leaves a usable manifest
+        samples_file = Path(output_dir) / "voice_samples.ndjson"
+        
+        if mock:
+            # Nothing to wait on: write all mock samples in one pass on a worker thread
+            generated = await asyncio.to_thread(_generate_mock_samples, generator, personas, output_dir,
+                                                sample_text, samples_file)
+        else:
+            generated = await _generate_samples(generator, personas, output_dir, sample_text, samples_file)
+        
+        console.print(f"✅ Generated {generated}/{len(personas)} voice samples")
     
     console.print(f"\n🎯 Enhanced voice generation complete!")
     console.print(f"📊 Generated {len(personas)} voice personas")
     console.print(f"💾 Voice mapping saved to {output_dir}/enhanced_voice_mapping.json")
+    if create_samples:
+        console.print(f"🎧 Sample manifest saved to {output_dir}/voice_samples.ndjson")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file